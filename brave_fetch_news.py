@@ -17,13 +17,67 @@ License: MIT
 
 import os
 import json
-import re
+import time
+import hashlib
+import functools
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import urlsplit
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Brave Search API endpoint
 # See https://brave.com/search/api/ for API documentation
 BRAVE_URL = "https://api.search.brave.com/res/v1/news/search"
 
+# Concurrency for multi-term fetches
+# BRAVE_MAX_WORKERS threads issue searches, at most BRAVE_MAX_INFLIGHT
+# requests are in flight at once to stay under the Brave rate limit
+BRAVE_MAX_WORKERS = int(os.environ.get("BRAVE_MAX_WORKERS", "8"))
+BRAVE_MAX_INFLIGHT = int(os.environ.get("BRAVE_MAX_INFLIGHT", "4"))
+_INFLIGHT = threading.Semaphore(BRAVE_MAX_INFLIGHT)
+
+# Shared HTTP session - keep-alive connections are reused across search terms
+# instead of paying a fresh TCP + TLS handshake per request. Every request
+# goes to one host and the semaphore above caps concurrency, so the pool
+# holds exactly BRAVE_MAX_INFLIGHT warm connections
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=BRAVE_MAX_INFLIGHT,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False
+    )
+))
+_SESSION.headers.update({"Accept": "application/json"})
+
+# On-disk response cache for Brave queries
+# News results are only coarsely fresh, so identical queries within
+# BRAVE_CACHE_TTL seconds are served from disk (set to 0 to disable)
+BRAVE_CACHE_DIR = ".brave_cache"
+BRAVE_CACHE_TTL = int(os.environ.get("BRAVE_CACHE_TTL", "600"))
+
+# Per-key rate limit: each key starts at most one request every
+# BRAVE_MIN_INTERVAL seconds (free tier is 1 req/s)
+BRAVE_MIN_INTERVAL = float(os.environ.get("BRAVE_MIN_INTERVAL", "1.0"))
+_KEY_NEXT_SLOT = {}
+_KEY_LOCK = threading.Lock()
+
+
 # Get API key from environment
 def get_brave_api_key() -> str:
     """
@@ -35,6 +89,72 @@ def get_brave_api_key() -> str:
     return os.environ.get("BRAVE_API_KEY", "")
 
 
+def get_brave_api_keys() -> list:
+    """
+    Get all Brave API keys from the environment.
+    
+    Reads the BRAVE_API_KEYS_JSON array, falling back to BRAVE_API_KEY.
+    Called for every search, so the parse is cached per distinct value of
+    the two variables; a key rotated in the environment is still seen.
+    
+    Returns:
+        list: Non-empty API keys (may be empty if none are set)
+    """
+    return list(_parse_brave_api_keys(
+        os.environ.get("BRAVE_API_KEYS_JSON", ""), get_brave_api_key()
+    ))
+
+
+@functools.lru_cache(maxsize=4)
+def _parse_brave_api_keys(keys_json: str, single_key: str) -> tuple:
+    """
+    Parse BRAVE_API_KEYS_JSON, falling back to the single key.
+    
+    Args:
+        keys_json (str): Raw BRAVE_API_KEYS_JSON value
+        single_key (str): BRAVE_API_KEY value
+    
+    Returns:
+        tuple: Non-empty API keys
+    """
+    try:
+        raw = keys_json or "[]"
+        keys = orjson.loads(raw) if orjson else json.loads(raw)
+    except ValueError:
+        print("Warning: BRAVE_API_KEYS_JSON is not valid JSON")
+        keys = []
+    if not isinstance(keys, list):
+        keys = []
+    keys = tuple(k for k in keys if isinstance(k, str) and k)
+    if not keys and single_key:
+        keys = (single_key,)
+    return keys
+
+
+def acquire_brave_key(keys: list) -> str:
+    """
+    Reserve the next request slot on whichever key is free soonest.
+    
+    Slots on a key are BRAVE_MIN_INTERVAL seconds apart; the caller sleeps
+    until its slot, so concurrent searches spread across all keys and never
+    exceed any key's rate.
+    
+    Args:
+        keys (list): Candidate API keys
+    
+    Returns:
+        str: The key to use for one request
+    """
+    with _KEY_LOCK:
+        now = time.monotonic()
+        key = min(keys, key=lambda k: _KEY_NEXT_SLOT.get(k, 0.0))
+        slot = max(now, _KEY_NEXT_SLOT.get(key, 0.0))
+        _KEY_NEXT_SLOT[key] = slot + BRAVE_MIN_INTERVAL
+    if slot > now:
+        time.sleep(slot - now)
+    return key
+
+
 def clamp(s: str, n: int) -> str:
     """
     Clean and truncate a string to a maximum length.
@@ -51,11 +171,23 @@ def clamp(s: str, n: int) -> str:
     if s is None:
         s = ""
     s = str(s)
-    # Remove extra whitespace
-    s = re.sub(r"\s+", " ", s).strip()
+    # Bound the work on oversized/garbage fields: collapse just the first
+    # n*4 characters. That is a prefix of the full collapsed string, so if
+    # it still has n characters it gives the same result; long whitespace
+    # runs can shrink it below n, and then the whole string is collapsed.
+    if len(s) > n * 4:
+        head = " ".join(s[:n * 4].split())
+        if len(head) >= n:
+            return head[:n]
+    # Remove extra whitespace (split() collapses runs and trims the ends)
+    s = " ".join(s.split())
     return s[:n]
 
 
+_IMAGE_KEYS = ("image", "thumbnail", "img")
+_HTTP_PREFIXES = ("http://", "https://")
+
+
 def pick_image(item: dict) -> str:
     """
     Extract image URL from Brave API response item.
@@ -70,15 +202,17 @@ def pick_image(item: dict) -> str:
         str: Image URL or empty string if not found
     """
     # Try common image keys
-    for k in ("image", "thumbnail", "img"):
+    for k in _IMAGE_KEYS:
         v = item.get(k)
-        if isinstance(v, str) and v.startswith("http"):
-            return v
+        if not v:
+            continue
+        t = type(v)
         # Handle nested object format
-        if isinstance(v, dict):
-            u = v.get("url") or v.get("src")
-            if isinstance(u, str) and u.startswith("http"):
-                return u
+        if t is dict:
+            v = v.get("url") or v.get("src")
+            t = type(v)
+        if t is str and v.startswith(_HTTP_PREFIXES):
+            return v
     return ""
 
 
@@ -87,31 +221,46 @@ def load_terms() -> list:
     Load search terms from environment variable.
     
     Reads SEARCH_TERMS_JSON from environment (or .env file via python-dotenv)
-    and validates it's a non-empty list.
+    and validates it's a non-empty list. The parsed terms are cached for the
+    life of the process; callers get a fresh list they may modify.
     
     Returns:
         list: List of search terms
     
+    Raises:
+        Exception: If SEARCH_TERMS_JSON is missing or invalid
+    """
+    return list(_load_terms_cached())
+
+
+@functools.lru_cache(maxsize=1)
+def _load_terms_cached() -> tuple:
+    """
+    Parse and clean SEARCH_TERMS_JSON once per process.
+    
+    Returns:
+        tuple: Cleaned search terms
+    
     Raises:
         Exception: If SEARCH_TERMS_JSON is missing or invalid
     """
     # Try environment variable first
-    raw = os.environ.get("SEARCH_TERMS_JSON", "")
+    raw = os.environ.get("SEARCH_TERMS_JSON", "").strip()
     
     # If empty, try loading from .env file
-    if not raw or not str(raw).strip():
+    if not raw:
         try:
             from dotenv import load_dotenv
             load_dotenv()
-            raw = os.environ.get("SEARCH_TERMS_JSON", "")
+            raw = os.environ.get("SEARCH_TERMS_JSON", "").strip()
         except ImportError:
             pass
     
-    if not raw or not str(raw).strip():
+    if not raw:
         raise Exception("Missing environment variable: SEARCH_TERMS_JSON")
 
     try:
-        terms = json.loads(raw) if isinstance(raw, str) else raw
+        terms = orjson.loads(raw) if orjson else json.loads(raw)
     except Exception as e:
         raise Exception(f"SEARCH_TERMS_JSON is not valid JSON: {e}")
 
@@ -128,7 +277,86 @@ def load_terms() -> list:
     if not cleaned:
         raise Exception("No valid search terms found in SEARCH_TERMS_JSON")
 
-    return cleaned
+    return tuple(cleaned)
+
+
+def _cache_path(query: str, count: int) -> str:
+    """
+    Build the cache file path for a Brave query.
+    
+    Args:
+        query (str): Search query string
+        count (int): Number of results requested
+    
+    Returns:
+        str: Path of the cache file for this query
+    """
+    key = hashlib.sha1(f"{query}\n{count}".encode("utf-8")).hexdigest()
+    return os.path.join(BRAVE_CACHE_DIR, f"{key}.json")
+
+
+def _cache_read(path: str):
+    """
+    Read cached articles if the entry is younger than BRAVE_CACHE_TTL.
+    
+    Args:
+        path (str): Cache file path
+    
+    Returns:
+        list: Cached articles, or None on miss/expiry
+    """
+    if BRAVE_CACHE_TTL <= 0:
+        return None
+    try:
+        if time.time() - os.path.getmtime(path) >= BRAVE_CACHE_TTL:
+            return None
+        with open(path, "rb") as f:
+            raw = f.read()
+        return orjson.loads(raw) if orjson else json.loads(raw)
+    except (OSError, ValueError):
+        return None
+
+
+def _cache_write(path: str, articles: list) -> None:
+    """
+    Atomically write articles to the cache.
+    
+    Args:
+        path (str): Cache file path
+        articles (list): Articles to cache
+    """
+    if BRAVE_CACHE_TTL <= 0:
+        return
+    try:
+        os.makedirs(BRAVE_CACHE_DIR, exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(orjson.dumps(articles) if orjson else json.dumps(articles).encode("utf-8"))
+        os.replace(tmp, path)
+    except (OSError, TypeError) as e:
+        print(f"Brave cache write error: {e}")
+
+
+def _iter_results(resp) -> list:
+    """
+    Iterate the "results" array of a Brave response.
+    
+    With ijson installed the items are parsed straight off the socket, so
+    the full JSON tree is never built; otherwise the body is parsed whole
+    (from its bytes with orjson if installed).
+    
+    Args:
+        resp (requests.Response): Brave API response (streamed if ijson)
+    
+    Returns:
+        iterable: Result item dictionaries
+    """
+    if ijson is None:
+        data = orjson.loads(resp.content) if orjson else resp.json()
+        return data.get("results", [])
+    # Let urllib3 undo gzip/deflate before ijson sees the bytes
+    resp.raw.decode_content = True
+    return ijson.items(resp.raw, "results.item")
 
 
 def search_brave(query: str, api_key: str = None, count: int = 10) -> list:
@@ -136,6 +364,9 @@ def search_brave(query: str, api_key: str = None, count: int = 10) -> list:
     Search Brave News API for articles matching query.
     
     Makes a request to Brave Search API and returns formatted results.
+    Responses are cached on disk for BRAVE_CACHE_TTL seconds. Requests are
+    rate limited per key; without an explicit key, the least busy key from
+    get_brave_api_keys() is used.
     
     Args:
         query (str): Search query string
@@ -145,16 +376,21 @@ def search_brave(query: str, api_key: str = None, count: int = 10) -> list:
     Returns:
         list: List of article dictionaries with title, description, url, etc.
     """
-    if not api_key:
-        api_key = get_brave_api_key()
+    keys = [api_key] if api_key else get_brave_api_keys()
     
-    if not api_key:
+    if not keys:
         print("Warning: No Brave API key provided")
         return []
 
+    cache_path = _cache_path(query, count)
+    cached = _cache_read(cache_path)
+    if cached is not None:
+        return cached
+    
+    api_key = acquire_brave_key(keys)
+
     headers = {
-        "X-Subscription-Token": api_key,
-        "Accept": "application/json"
+        "X-Subscription-Token": api_key
     }
     
     params = {
@@ -164,27 +400,29 @@ def search_brave(query: str, api_key: str = None, count: int = 10) -> list:
     }
 
     try:
-        resp = requests.get(BRAVE_URL, headers=headers, params=params, timeout=30)
-        
-        if resp.status_code != 200:
-            print(f"Brave API error: {resp.status_code}")
-            return []
-        
-        data = resp.json()
-        results = data.get("results", [])
-        
         articles = []
-        for item in results:
-            article = {
-                "title": clamp(item.get("title", ""), 200),
-                "description": clamp(item.get("description", ""), 500),
-                "url": item.get("url", ""),
-                "domain": item.get("domain", ""),
-                "age": item.get("age", ""),
-                "image": pick_image(item)
-            }
-            articles.append(article)
+        with _INFLIGHT:
+            resp = _SESSION.get(BRAVE_URL, headers=headers, params=params,
+                                timeout=30, stream=ijson is not None)
+            try:
+                if resp.status_code != 200:
+                    print(f"Brave API error: {resp.status_code}")
+                    return []
+                
+                for item in _iter_results(resp):
+                    article = {
+                        "title": clamp(item.get("title", ""), 200),
+                        "description": clamp(item.get("description", ""), 500),
+                        "url": item.get("url", ""),
+                        "domain": item.get("domain", ""),
+                        "age": item.get("age", ""),
+                        "image": pick_image(item)
+                    }
+                    articles.append(article)
+            finally:
+                resp.close()
         
+        _cache_write(cache_path, articles)
         return articles
 
     except Exception as e:
@@ -192,6 +430,43 @@ def search_brave(query: str, api_key: str = None, count: int = 10) -> list:
         return []
 
 
+# Query parameters that only track the click, not select the article
+_TRACKING_PARAM_PREFIXES = ("utm_", "mc_")
+_TRACKING_PARAMS = frozenset({"fbclid", "gclid", "ref", "cmpid"})
+
+
+def _is_tracking_param(pair: str) -> bool:
+    name = pair.partition("=")[0].lower()
+    return name in _TRACKING_PARAMS or name.startswith(_TRACKING_PARAM_PREFIXES)
+
+
+@functools.lru_cache(maxsize=4096)
+def canonical_url(url: str) -> str:
+    """
+    Normalize an article URL for duplicate detection.
+    
+    Lowercases the host, drops "www.", the scheme, fragment, a trailing
+    slash and tracking parameters, so the same article reached through
+    different links compares equal (same rules as cnd_news_pipeline).
+    
+    Args:
+        url (str): Article URL
+    
+    Returns:
+        str: Canonical key for the URL
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = "&".join(
+        pair for pair in parts.query.split("&")
+        if pair and not _is_tracking_param(pair)
+    )
+    path = parts.path.rstrip("/") or "/"
+    return f"{host}{path}?{query}" if query else f"{host}{path}"
+
+
 def fetch_all_news(terms: list = None, articles_per_term: int = 10) -> list:
     """
     Fetch news for multiple search terms.
@@ -201,18 +476,35 @@ def fetch_all_news(terms: list = None, articles_per_term: int = 10) -> list:
         articles_per_term (int): Number of articles per term
     
     Returns:
-        list: Combined list of all articles
+        list: Combined list of all articles, one per URL
     """
     if not terms:
         terms = load_terms()
     
+    # Overlapping terms (a brand and its category) often surface the
+    # same story; repeated terms are only searched once
+    terms = list(dict.fromkeys(terms))
     all_articles = []
-    api_key = get_brave_api_key()
+    seen_urls = set()
     
-    for term in terms:
+    def fetch_term(term):
         print(f"Searching: {term}")
-        articles = search_brave(term, api_key, articles_per_term)
-        all_articles.extend(articles)
+        # No key passed, so each search takes whichever key is free first
+        return search_brave(term, count=articles_per_term)
+    
+    # Terms are independent, so fetch them concurrently; map() keeps
+    # results in the same order as the terms. Results are merged here on
+    # the calling thread, so the URL set needs no lock.
+    with ThreadPoolExecutor(max_workers=max(1, min(BRAVE_MAX_WORKERS, len(terms)))) as ex:
+        for articles in ex.map(fetch_term, terms):
+            for article in articles:
+                url = article.get("url", "")
+                if url:
+                    key = canonical_url(url)
+                    if key in seen_urls:
+                        continue
+                    seen_urls.add(key)
+                all_articles.append(article)
     
     return all_articles
 
@@ -29,11 +29,19 @@ License: MIT
 import os
 import json
 import time
-import datetime as dt
 import requests
 import mimetypes
+import functools
+from bisect import bisect_right
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import List, Dict, Any, Optional
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # =============================================================================
 # Configuration
 # =============================================================================
@@ -47,20 +55,48 @@ HOURLY_CAP = int(os.environ.get("CND_HOURLY_CAP", "8"))     # 7 or 8 recommended
 DAILY_CAP = int(os.environ.get("CND_DAILY_CAP", "180"))   # 150-200 range
 RUN_ENABLED = os.environ.get("CND_RUN_ENABLED", "1") == "1"
 
+# Image prompt template; %s is the (truncated) post title
+_PROMPT_TPL = "Featured image for: %s. Professional news article illustration."
+
+# Shared HTTP session - WordPress and image generator calls reuse keep-alive
+# connections across the post loop instead of re-handshaking every request
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False
+    )
+)
+# Local generators (OpenClaw, ComfyUI) are plain http
+_SESSION.mount("https://", _ADAPTER)
+_SESSION.mount("http://", _ADAPTER)
+
+# WordPress write responses that count as success
+_OK_STATUSES = frozenset({200, 201})
+
+# Shared read-only fallback for missing nested objects in API responses
+_EMPTY: Dict[str, Any] = {}
+
 
 def load_usage() -> List[float]:
     """
     Load timestamp history of image generations.
     
     Returns:
-        list: List of Unix timestamps when images were generated
+        list: Sorted list of Unix timestamps when images were generated
     """
     if not os.path.exists(USAGE_FILE):
         return []
     try:
-        data = json.load(open(USAGE_FILE, "r", encoding="utf-8"))
+        with open(USAGE_FILE, "rb") as f:
+            raw = f.read()
+        data = orjson.loads(raw) if orjson else json.loads(raw)
         if isinstance(data, list):
-            return [float(x) for x in data]
+            return sorted(float(x) for x in data)
     except Exception:
         pass
     return []
@@ -73,7 +109,12 @@ def save_usage(ts: List[float]) -> None:
     Args:
         ts (list): List of Unix timestamps
     """
-    json.dump(ts, open(USAGE_FILE, "w", encoding="utf-8"), indent=2)
+    if orjson:
+        payload = orjson.dumps(ts, option=orjson.OPT_INDENT_2)
+    else:
+        payload = json.dumps(ts, indent=2).encode("utf-8")
+    with open(USAGE_FILE, "wb") as f:
+        f.write(payload)
 
 
 def prune(ts: List[float], seconds: int) -> List[float]:
@@ -81,27 +122,31 @@ def prune(ts: List[float], seconds: int) -> List[float]:
     Remove timestamps older than specified seconds.
     
     Args:
-        ts (list): List of Unix timestamps
+        ts (list): Sorted list of Unix timestamps
         seconds (int): Age threshold in seconds
     
     Returns:
         list: Filtered list with only recent timestamps
     """
     cutoff = time.time() - seconds
-    return [t for t in ts if t > cutoff]
+    return ts[bisect_right(ts, cutoff):]
 
 
-def can_generate() -> bool:
+def can_generate(usage: Optional[List[float]] = None) -> bool:
     """
     Check if we can generate another image (rate limiting).
     
     Checks both hourly and daily caps before allowing generation.
     
+    Args:
+        usage (list, optional): In-memory usage timestamps; loaded from
+            USAGE_FILE if not provided
+    
     Returns:
         bool: True if generation is allowed
     """
-    usage = load_usage()
-    now = time.time()
+    if usage is None:
+        usage = load_usage()
     
     # Count usage in last hour
     hourly = prune(usage, 3600)
@@ -118,20 +163,35 @@ def can_generate() -> bool:
     return True
 
 
-def record_usage() -> None:
+def record_usage(usage: Optional[List[float]] = None) -> None:
     """
     Record current timestamp as an image generation event.
+    
+    Args:
+        usage (list, optional): In-memory usage timestamps to update in
+            place; loaded from USAGE_FILE if not provided
     """
-    usage = load_usage()
+    if usage is None:
+        usage = load_usage()
+    # Anything older than a day no longer counts towards either cap
+    usage[:] = prune(usage, 86400)
     usage.append(time.time())
     save_usage(usage)
 
 
+def response_json(resp) -> Any:
+    """Parse a JSON response body, with orjson when installed."""
+    return orjson.loads(resp.content) if orjson else resp.json()
+
+
 def get_posts_needing_images(limit: int = 10) -> List[Dict]:
     """
     Fetch posts from WordPress that need featured images.
     
-    Uses WPGraphQL or REST API to find posts without featured images.
+    Prefers the cnd-openclaw plugin endpoint, which filters on
+    _thumbnail_id server-side and returns only posts that need work.
+    Falls back to the core REST API (filtered client-side) when the
+    plugin is not installed.
     
     Args:
         limit (int): Maximum number of posts to fetch
@@ -144,9 +204,33 @@ def get_posts_needing_images(limit: int = 10) -> List[Dict]:
     wp_user = os.environ.get("WP_USER", "")
     wp_pass = os.environ.get("WP_APP_PASSWORD", "")
     
+    try:
+        resp = _SESSION.get(
+            f"{wp_base}/cnd/v1/posts-needs-images",
+            auth=(wp_user, wp_pass),
+            # Newest first, like /wp/v2/posts: generations are capped per
+            # day, so fresh articles shouldn't wait behind old ones
+            params={"limit": limit, "order": "desc"},
+            timeout=30
+        )
+        
+        if resp.status_code == 200:
+            # Plugin returns a flat title string; match the REST shape
+            return [
+                {
+                    "id": p.get("id"),
+                    "title": {"rendered": p.get("title") or ""},
+                    "featured_media": 0
+                }
+                for p in response_json(resp)
+            ]
+    
+    except Exception as e:
+        print(f"Plugin endpoint unavailable, using REST: {e}")
+    
     try:
         # Query posts without featured image
-        resp = requests.get(
+        resp = _SESSION.get(
             f"{wp_base}/wp/v2/posts",
             auth=(wp_user, wp_pass),
             params={
@@ -156,7 +240,7 @@ def get_posts_needing_images(limit: int = 10) -> List[Dict]:
         )
         
         if resp.status_code == 200:
-            posts = resp.json()
+            posts = response_json(resp)
             # Filter to posts without featured image
             return [p for p in posts if p.get("featured_media") == 0]
     
@@ -183,7 +267,7 @@ def generate_image_openclaw(prompt: str, width: int = 1200, height: int = 630) -
     openclaw_url = os.environ.get("OPENCLAW_URL", "http://localhost:8050")
     
     try:
-        resp = requests.post(
+        resp = _SESSION.post(
             f"{openclaw_url}/generate",
             json={
                 "prompt": prompt,
@@ -195,7 +279,7 @@ def generate_image_openclaw(prompt: str, width: int = 1200, height: int = 630) -
         )
         
         if resp.status_code == 200:
-            data = resp.json()
+            data = response_json(resp)
             return data.get("image_url")
     
     except Exception as e:
@@ -221,7 +305,7 @@ def generate_image_comfyui(prompt: str, width: int = 1200, height: int = 630) ->
     try:
         # ComfyUI workflow would go here
         # This is a simplified example
-        resp = requests.post(
+        resp = _SESSION.post(
             f"{comfyui_url}/prompt",
             json={"prompt": {"inputs": {"text": prompt}}},
             timeout=180
@@ -237,6 +321,22 @@ def generate_image_comfyui(prompt: str, width: int = 1200, height: int = 630) ->
     return None
 
 
+@functools.lru_cache(maxsize=32)
+def guess_ext(content_type: str) -> str:
+    """
+    Map an image Content-Type to a file extension.
+    
+    Cached, since generators only ever return a handful of types.
+    
+    Args:
+        content_type (str): MIME type, e.g. "image/png"
+    
+    Returns:
+        str: Extension including the dot (".jpg" if unknown)
+    """
+    return mimetypes.guess_extension(content_type) or ".jpg"
+
+
 def upload_to_wordpress(image_url: str, post_id: int) -> Optional[int]:
     """
     Download generated image and upload to WordPress media library.
@@ -253,34 +353,41 @@ def upload_to_wordpress(image_url: str, post_id: int) -> Optional[int]:
     wp_pass = os.environ.get("WP_APP_PASSWORD", "")
     
     try:
-        # Download image
-        img_resp = requests.get(image_url, timeout=60)
-        if img_resp.status_code != 200:
-            return None
-        
-        # Determine content type
-        content_type = img_resp.headers.get("Content-Type", "image/jpeg")
-        ext = mimetypes.guess_extension(content_type) or ".jpg"
-        
-        # Upload to WordPress
-        files = {
-            "file": (f"featured{ext}", img_resp.content, content_type)
-        }
-        
-        data = {
-            "alt_text": f"Featured image for post {post_id}",
-            "post": post_id
-        }
-        
-        resp = requests.post(
-            f"{wp_base}/wp/v2/media",
-            auth=(wp_user, wp_pass),
-            files=files,
-            data=data
-        )
+        # Download image; it is sent on as a raw body below rather than
+        # copied into a multipart form
+        with _SESSION.get(image_url, timeout=60, stream=True) as img_resp:
+            if img_resp.status_code != 200:
+                return None
+            
+            # Determine content type
+            content_type = img_resp.headers.get("Content-Type", "image/jpeg")
+            ext = guess_ext(content_type)
+            
+            # Upload to WordPress as a raw body; attachment fields go in
+            # the query string since there is no multipart form
+            headers = {
+                "Content-Type": content_type,
+                "Content-Disposition": f'attachment; filename="featured{ext}"'
+            }
+            # Buffered as bytes so requests sends a plain Content-Length;
+            # it can't size a raw urllib3 stream and would frame that as
+            # chunked, clashing with a hand-set Content-Length
+            body = img_resp.content
+            
+            resp = _SESSION.post(
+                f"{wp_base}/wp/v2/media",
+                auth=(wp_user, wp_pass),
+                headers=headers,
+                params={
+                    "alt_text": f"Featured image for post {post_id}",
+                    "post": post_id
+                },
+                data=body,
+                timeout=180
+            )
         
-        if resp.status_code in (200, 201):
-            return resp.json()["id"]
+        if resp.status_code in _OK_STATUSES:
+            return response_json(resp)["id"]
     
     except Exception as e:
         print(f"Upload error: {e}")
@@ -304,13 +411,13 @@ def set_featured_image(post_id: int, media_id: int) -> bool:
     wp_pass = os.environ.get("WP_APP_PASSWORD", "")
     
     try:
-        resp = requests.post(
+        resp = _SESSION.post(
             f"{wp_base}/wp/v2/posts/{post_id}",
             auth=(wp_user, wp_pass),
             json={"featured_media": media_id}
         )
         
-        return resp.status_code in (200, 201)
+        return resp.status_code in _OK_STATUSES
     
     except Exception as e:
         print(f"Set featured error: {e}")
@@ -339,19 +446,22 @@ def process_posts(limit: int = 5) -> Dict[str, int]:
     # Get posts needing images
     posts = get_posts_needing_images(limit)
     
+    # Load rate-limit state once; record_usage keeps it current
+    usage = load_usage()
+    
     for post in posts:
         post_id = post.get("id")
-        title = post.get("title", {}).get("rendered", "Untitled")[:50]
+        title = (post.get("title") or _EMPTY).get("rendered", "Untitled")[:50]
         
         # Check rate limits
-        if not can_generate():
+        if not can_generate(usage):
             print("Rate limit reached, stopping")
             break
         
         stats["attempted"] += 1
         
         # Build prompt from title
-        prompt = f"Featured image for: {title}. Professional news article illustration."
+        prompt = _PROMPT_TPL % title
         
         # Try to generate image
         image_url = generate_image_openclaw(prompt)
@@ -366,7 +476,7 @@ def process_posts(limit: int = 5) -> Dict[str, int]:
             continue
         
         stats["generated"] += 1
-        record_usage()
+        record_usage(usage)
         
         # Upload to WordPress
         media_id = upload_to_wordpress(image_url, post_id)
@@ -384,7 +494,7 @@ def main():
     """
     Main entry point for hourly image worker.
     """
-    print(f"Image Worker - {dt.datetime.now().isoformat()}")
+    print(f"Image Worker - {time.strftime('%Y-%m-%dT%H:%M:%S')}")
     print(f"Rate limits: {HOURLY_CAP}/hour, {DAILY_CAP}/day")
     
     if not RUN_ENABLED:
@@ -78,13 +78,15 @@ class CND_OpenClaw {
     
     public function get_posts_needing_images($request) {
         $limit = $request->get_param('limit') ?: 50;
+        // Oldest first by default; callers may ask for newest first
+        $order = strtoupper((string) $request->get_param('order')) === 'DESC' ? 'DESC' : 'ASC';
         
         $posts = get_posts([
             'post_type' => 'post',
             'post_status' => 'publish',
             'posts_per_page' => $limit,
             'orderby' => 'date',
-            'order' => 'ASC',
+            'order' => $order,
             'meta_query' => [
                 'relation' => 'OR',
                 ['key' => '_thumbnail_id', 'compare' => 'NOT EXISTS'],
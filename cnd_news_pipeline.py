@@ -16,7 +16,13 @@ Environment Variables (can also be set in config.json):
     WP_USER              - WordPress username
     WP_APP_PASSWORD      - WordPress application password
     LOCAL_LLM_BASE_URL   - Local LLM server URL (default: http://172.17.0.1:1240)
-    LOCAL_LLM_MODEL      - Model name for local LLM
+    LOCAL_LLM_MODEL      - Model name for local LLM (a smaller quant such
+                           as Q4_0 decodes faster for these short rewrites)
+    LLM_MAX_TOKENS       - Completion token limit (default: 1200)
+    LLM_PARALLEL         - Concurrent LLM rewrites (default: 1)
+    LLM_TEMPERATURE      - Sampling temperature (default: 0.2)
+    LLM_SEED             - Sampling seed, empty for none (default: 42)
+    MIN_DESC_WORDS       - Skip articles with shorter descriptions (default: 15)
     DASHBOARD_URL        - Dashboard URL for status updates
     PUBLISH_MODE         - 'draft' or 'publish'
 
@@ -29,12 +35,33 @@ License: MIT
 
 import os
 import json
+import math
+import mmap
+import queue
+import atexit
+import logging
+import logging.handlers
+import time
+import struct
+import hashlib
+import html
+import functools
+import threading
 import requests
 import datetime as dt
 import random
 import re
+import sys
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from dataclasses import dataclass, field
+from requests.adapters import HTTPAdapter
+from requests.auth import HTTPBasicAuth
+from urllib3.util.retry import Retry
 from typing import List, Dict, Any, Optional
 from datetime import datetime
+from urllib.parse import urlsplit
+from email.utils import parsedate_to_datetime
 
 # Try to import social poster
 try:
@@ -43,6 +70,119 @@ try:
 except ImportError:
     HAS_SOCIAL = False
 
+# Logging - records are handed to a queue and written by one listener
+# thread, so fetch/upload worker threads never block on stdout
+logger = logging.getLogger("cnd")
+_log_listener = None
+
+
+def setup_logging(level: int = logging.INFO) -> None:
+    """
+    Route the "cnd" logger through a QueueHandler to a background
+    StreamHandler. Safe to call more than once.
+    
+    Args:
+        level (int): Logging level for the pipeline logger
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return
+    log_queue = queue.SimpleQueue()
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+    _log_listener = logging.handlers.QueueListener(log_queue, stream)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(level)
+    logger.propagate = False
+
+
+# Stream RSS with lxml when available; the stdlib parser has the same
+# iterparse API and is used otherwise
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:
+    import xml.etree.ElementTree as etree
+    lxml_html = None
+
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+
+
+# Use orjson for cache/config files when available
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Semantic LLM cache needs numpy and sentence-transformers; it is simply
+# unavailable without them
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    np = None
+    SentenceTransformer = None
+
+# blake3 for cache keys when available, blake2b otherwise
+try:
+    from blake3 import blake3
+except ImportError:
+    blake3 = None
+
+
+def cache_digest(text: str) -> str:
+    """
+    32-hex-char digest naming an on-disk cache entry.
+    
+    Only used for cache file names, so switching between blake3 and
+    blake2b just costs a cold cache. The processed-URL Bloom filter keeps
+    blake2b unconditionally since its bit positions are persisted.
+    """
+    data = text.encode("utf-8")
+    if blake3 is not None:
+        return blake3(data).hexdigest(length=16)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def read_json_file(path: str) -> Any:
+    """Parse a JSON file, using orjson if installed."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+
+def response_json(resp) -> Any:
+    """
+    Parse a JSON response body, using orjson if installed.
+    
+    orjson reads resp.content (already decompressed by urllib3) directly,
+    skipping requests' text decoding and charset detection.
+    """
+    return orjson.loads(resp.content) if orjson else resp.json()
+
+
+def write_json_file(path: str, obj: Any) -> None:
+    """
+    Atomically write obj as compact JSON, using orjson if installed.
+    
+    Only caches go through here, so there is no indentation - it roughly
+    halves the size of the tag/category cache and its write time.
+    The data goes to a temp file that is renamed over path, so readers
+    (and the next run after a crash) never see a half-written file.
+    """
+    if orjson:
+        # wp_cache term maps are keyed by int id
+        payload = orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    else:
+        payload = json.dumps(obj, separators=(",", ":")).encode("utf-8")
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(payload)
+    os.replace(tmp, path)
+
+
 # RSS Feed sources
 RSS_FEEDS = [
     # Creator Economy
@@ -193,14 +333,32 @@ PLATFORM_POLICIES = {
     }
 }
 
+# Platforms a policy post can be about, for random.choice
+_PLATFORM_KEYS = tuple(PLATFORM_POLICIES)
+
 # Hashtag for policy reminder posts
 POLICY_REMINDER_HASHTAG = "#CreatorsListenUp"
 # ============================================================================
 
 # Brave Search API configuration
-# Multiple keys can be provided for rate limiting - script will rotate through them
+# Multiple keys can be provided for rate limiting - requests are spread
+# over them by BraveKeyPool
 BRAVE_API_KEY = os.environ.get("BRAVE_API_KEY", "")
 BRAVE_API_KEYS_JSON = os.environ.get("BRAVE_API_KEYS_JSON", "[]")
+# Seconds per request per key (free tier is 1 req/s), and how many
+# requests a key may burst after being idle
+BRAVE_MIN_INTERVAL = float(os.environ.get("BRAVE_MIN_INTERVAL", "1.0"))
+BRAVE_KEY_BURST = int(os.environ.get("BRAVE_KEY_BURST", "1"))
+# Threads running Brave searches (cache lookups included) concurrently
+BRAVE_PREFETCH_WORKERS = int(os.environ.get("BRAVE_PREFETCH_WORKERS", "8"))
+# Sources whose results are skipped; a host matches if it is one of these
+# or a subdomain of one (so "old.reddit.com" is covered by "reddit.com")
+SKIP_DOMAINS = frozenset({"reddit.com", "youtu.be", "instagram.com",
+                          "tiktok.com", "twitter.com", "x.com"})
+# On-disk cache of Brave results, keyed by (query, count, UTC day)
+BRAVE_CACHE_DIR = ".brave_cache"
+BRAVE_CACHE_TTL = int(os.environ.get("BRAVE_CACHE_TTL", "21600"))  # 6 hours
+BRAVE_CACHE_ENABLED = True  # --no-cache turns this off
 
 # WordPress configuration
 WP_API_BASE = os.environ.get("WP_API_BASE", "")
@@ -211,6 +369,28 @@ WP_APP_PASSWORD = os.environ.get("WP_APP_PASSWORD", "")
 # The local LLM server should be running at the specified URL
 LOCAL_LLM_BASE_URL = os.environ.get("LOCAL_LLM_BASE_URL", "http://172.17.0.1:1240")
 LOCAL_LLM_MODEL = os.environ.get("LOCAL_LLM_MODEL", "Mistral-7B-Instruct-v0.3-Q4_K_M.gguf")
+# Generation limits: a rewrite is a headline, meta line, tags and 2-3
+# paragraphs, well under 1200 tokens. The stop strings end runs where the
+# model starts another section or echoes the instruction template.
+LLM_MAX_TOKENS = int(os.environ.get("LLM_MAX_TOKENS", "1200"))
+LLM_STOP = ("\n###", "[INST]", "<|end|>")
+# Low temperature plus a fixed seed: the same prompt gives the same
+# rewrite, so reruns are reproducible and cached output stays valid
+LLM_TEMPERATURE = float(os.environ.get("LLM_TEMPERATURE", "0.2"))
+LLM_SEED = os.environ.get("LLM_SEED", "42").strip()
+# Articles whose description is shorter than this are skipped before the
+# LLM call; there isn't enough source material for a 400-word post
+MIN_DESC_WORDS = int(os.environ.get("MIN_DESC_WORDS", "15"))
+# Send llama.cpp's cache_prompt flag; turn off for servers that reject it
+LLM_CACHE_PROMPT = os.environ.get("LLM_CACHE_PROMPT", "1") != "0"
+# Rewrites are cached by model and article content hash (see llm_cache_key)
+LLM_CACHE_DIR = ".llm_cache"
+LLM_CACHE_ENABLED = True  # --no-cache turns this off
+# Optional semantic layer: a cache miss is retried by embedding similarity
+# of the article text, so a lightly edited repost reuses the earlier rewrite
+LLM_SEMANTIC_CACHE = os.environ.get("LLM_SEMANTIC_CACHE", "0") == "1"
+LLM_SEMANTIC_MODEL = os.environ.get("LLM_SEMANTIC_MODEL", "all-MiniLM-L6-v2")
+LLM_SEMANTIC_THRESHOLD = float(os.environ.get("LLM_SEMANTIC_THRESHOLD", "0.92"))
 
 # Search and publishing configuration
 SEARCH_TERMS_JSON = os.environ.get("SEARCH_TERMS_JSON", "[]")
@@ -225,7 +405,12 @@ DASHBOARD_URL = os.environ.get("DASHBOARD_URL", "http://localhost:8000")
 CONFIG_FILE = "config.json"
 
 # Cache files to avoid duplicate processing
-PROCESSED_FILE = ".processed_urls.json"  # URLs already processed
+PROCESSED_FILE = ".processed_urls.json"  # URLs already processed (legacy format)
+PROCESSED_BLOOM_FILE = ".processed_urls.bloom"  # Bloom filter of processed URLs
+PROCESSED_LOG_FILE = ".processed_urls.log"      # URLs processed since the last save
+# First-layer size; the filter adds larger layers as it fills
+PROCESSED_BLOOM_CAPACITY = int(os.environ.get("PROCESSED_BLOOM_CAPACITY", "100000"))
+PROCESSED_BLOOM_ERROR_RATE = float(os.environ.get("PROCESSED_BLOOM_ERROR_RATE", "0.001"))
 CACHE_FILE = ".wp_cache.json"           # WordPress cache for categories/tags
 
 # Category mapping - maps search terms to WordPress category IDs
@@ -278,14 +463,14 @@ TAG_MAP = {
 }
 
 # Title strip tokens - remove site names from titles
-TITLE_STRIP_TOKENS = [
+TITLE_STRIP_TOKENS = (
     " | Tom's Guide", " - Tom's Guide", " — Tom's Guide",
     " | The Verge", " | TechCrunch", " | Engadget",
     " | PetaPixel", " | DPReview", " | Fstoppers",
     " | B&H Photo", " | B&H", "B&H eXplor",
     " | Adorama", " | YouTube", " | Twitch", " | Instagram",
     " — PetaPixel", " — TechCrunch", " — The Verge",
-]
+)
 
 # Brand tones - different writing styles per brand
 BRAND_TONES = {
@@ -325,9 +510,133 @@ BRAND_TONES = {
     ],
 }
 
+# Shared HTTP session - Brave, WordPress, RSS and the local LLM all reuse
+# pooled keep-alive connections instead of a new TCP/TLS handshake per call.
+# requests.Session is safe to share across the prefetch threads.
+# Retry's default allowed_methods leaves POST out of read/status retries on
+# purpose: re-sending a create after a lost response would duplicate posts.
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=64,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False
+    )
+)
+# The local LLM is plain http
+_SESSION.mount("https://", _ADAPTER)
+_SESSION.mount("http://", _ADAPTER)
+
+# (connect, read) timeout for WordPress REST calls
+WP_TIMEOUT = (5, 30)
+
+# Background pool for WordPress requests that can overlap (media uploads)
+_WP_POOL = ThreadPoolExecutor(max_workers=4)
+
+# Publisher thread for draft posts, so WP round-trips overlap with the
+# next LLM rewrite; at most PUBLISH_QUEUE_DEPTH drafts are in flight
+_PUBLISH_POOL = ThreadPoolExecutor(max_workers=1)
+PUBLISH_QUEUE_DEPTH = int(os.environ.get("PUBLISH_QUEUE_DEPTH", "4"))
+
+# Social shares run after the post is live and nothing waits on their
+# result, so they don't hold up the next query (see wait_for_social_posts)
+_SOCIAL_POOL = ThreadPoolExecutor(max_workers=2)
+_SOCIAL_JOBS = deque()
+
+# Concurrent LLM rewrites; match the llama.cpp server's --parallel slots
+LLM_PARALLEL = max(1, int(os.environ.get("LLM_PARALLEL", "1")))
+_LLM_POOL = ThreadPoolExecutor(max_workers=LLM_PARALLEL)
+
+# Queries whose candidate articles the fetch stage may prepare ahead of
+# the rewrite loop (see iter_query_articles)
+FETCH_QUEUE_DEPTH = int(os.environ.get("FETCH_QUEUE_DEPTH", "2"))
+
 # Global WordPress cache
-# Stores fetched categories, tags, and authors to reduce API calls
-wp_cache = {}
+# Stores fetched categories, tags, and authors to reduce API calls.
+# Entries carry a fetch timestamp ("ts") and lifetime in seconds ("ttl",
+# None = never expires); least recently used entries are evicted past
+# WP_CACHE_MAX_ENTRIES.
+wp_cache = OrderedDict()
+WP_CACHE_MAX_ENTRIES = int(os.environ.get("WP_CACHE_MAX_ENTRIES", "64"))
+WP_TERMS_TTL = int(os.environ.get("WP_TERMS_TTL", "60"))
+
+
+def _resolve_auth(auth: Dict) -> tuple:
+    """
+    Resolve an auth config into the REST base URL and requests auth pair.
+    
+    Args:
+        auth (dict): WordPress authentication (api_base, user, password);
+            missing keys fall back to the WP_* environment settings
+    
+    Returns:
+        tuple: (api_base, HTTPBasicAuth)
+    """
+    return (
+        auth.get("api_base", WP_API_BASE),
+        _basic_auth(auth.get("user", WP_USER), auth.get("password", WP_APP_PASSWORD))
+    )
+
+
+@functools.lru_cache(maxsize=16)
+def _basic_auth(user: str, password: str) -> HTTPBasicAuth:
+    """
+    Shared HTTPBasicAuth per credential pair.
+    
+    Passing a (user, password) tuple makes requests build a new auth
+    object on every call; keyed on the credential values, one instance
+    serves the whole run.
+    """
+    return HTTPBasicAuth(user, password)
+
+
+def wp_cache_get(key: str) -> Optional[Dict]:
+    """
+    Look up a wp_cache entry and mark it as recently used.
+    
+    Args:
+        key (str): Cache key
+    
+    Returns:
+        dict: Cache entry, or None if missing
+    """
+    entry = wp_cache.get(key)
+    if entry is not None:
+        wp_cache.move_to_end(key)
+    return entry
+
+
+def wp_cache_put(key: str, entry: Dict) -> None:
+    """
+    Insert a wp_cache entry, evicting the least recently used past the cap.
+    
+    Args:
+        key (str): Cache key
+        entry (dict): Entry with "ts", "ttl" and "data"
+    """
+    wp_cache[key] = entry
+    wp_cache.move_to_end(key)
+    while len(wp_cache) > WP_CACHE_MAX_ENTRIES:
+        wp_cache.popitem(last=False)
+
+
+def wp_cache_fresh(entry: Optional[Dict]) -> bool:
+    """
+    Check whether a wp_cache entry is still within its TTL.
+    
+    Args:
+        entry (dict): Cache entry (may be None)
+    
+    Returns:
+        bool: True if the entry can be used without revalidation
+    """
+    if not entry or "ts" not in entry:
+        return False
+    ttl = entry.get("ttl")
+    return ttl is None or time.time() - entry["ts"] < ttl
 
 
 def load_wp_cache():
@@ -340,13 +649,24 @@ def load_wp_cache():
     - Authors (id -> name mapping)
     
     This reduces API calls to WordPress during pipeline execution.
+    The file is memory-mapped and, with orjson, parsed straight from the
+    mapping without first copying it into a Python bytes object.
     """
     global wp_cache
     if os.path.exists(CACHE_FILE):
         try:
-            wp_cache = json.load(open(CACHE_FILE))
-        except:
-            wp_cache = {}
+            with open(CACHE_FILE, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if orjson:
+                        with memoryview(mm) as view:
+                            data = orjson.loads(view)
+                    else:
+                        data = json.loads(mm[:])
+            wp_cache = OrderedDict(data)
+        except (OSError, ValueError, TypeError) as e:
+            # Includes empty files, which mmap refuses to map
+            logger.debug(f"Ignoring unreadable {CACHE_FILE}: {e}")
+            wp_cache = OrderedDict()
 
 
 def save_wp_cache():
@@ -355,86 +675,411 @@ def save_wp_cache():
     
     Called after pipeline completes to persist cache for next run.
     """
-    json.dump(wp_cache, open(CACHE_FILE, "w"), indent=2)
+    write_json_file(CACHE_FILE, wp_cache)
+
+
+@dataclass
+class SearchConfig:
+    """
+    Validated search structure from a site's "search" config.
+    
+    structure maps category -> brand -> complete search queries. Brand
+    entries may be configured as a list of terms (queried as
+    "<brand> <term>") or as {"brands": [...], "description": ...}, whose
+    brand names are queried as-is. A category with no brand mapping
+    becomes a single query for the category name.
+    """
+    structure: Dict[str, Dict[str, List[str]]] = field(default_factory=dict)
+    
+    @classmethod
+    def from_dict(cls, search: Dict) -> "SearchConfig":
+        structure = {}
+        for category, brands in (search.get("structure") or {}).items():
+            if not isinstance(brands, dict):
+                structure[category] = {category: [category]}
+                continue
+            normalized = {}
+            for brand, terms in brands.items():
+                if isinstance(terms, dict):
+                    queries = terms.get("brands") or []
+                elif isinstance(terms, list):
+                    queries = [f"{brand} {term}" for term in terms]
+                else:
+                    queries = [f"{brand} {terms}"]
+                queries = [q for q in queries if isinstance(q, str) and q.strip()]
+                if queries:
+                    normalized[brand] = queries
+                else:
+                    logger.warning(f"Ignoring search config entry {category!r}/{brand!r}: no queries")
+            structure[category] = normalized
+        return cls(structure)
+    
+    def queries(self) -> List[str]:
+        """All search queries, in configured order."""
+        return [
+            query
+            for brands in self.structure.values()
+            for queries in brands.values()
+            for query in queries
+        ]
+
+
+_config_cache = {"mtime": None, "data": {}}
 
 
 def load_config() -> Dict:
     """
     Load configuration from config.json file.
     
+    The parsed config is memoized on the file's mtime, so repeated calls
+    only stat the file until it changes. Treat the result as read-only.
+    
     Returns:
         dict: Configuration dictionary or empty dict if file doesn't exist
     """
-    if os.path.exists(CONFIG_FILE):
-        try:
-            return json.load(open(CONFIG_FILE))
-        except:
-            pass
-    return {}
+    try:
+        mtime = os.stat(CONFIG_FILE).st_mtime_ns
+    except OSError:
+        return {}
+    if _config_cache["mtime"] == mtime:
+        return _config_cache["data"]
+    try:
+        data = read_json_file(CONFIG_FILE)
+    except (OSError, ValueError) as e:
+        logger.debug(f"Ignoring unreadable {CONFIG_FILE}: {e}")
+        return {}
+    _config_cache["mtime"] = mtime
+    _config_cache["data"] = data
+    return data
 
 
-def load_processed() -> set:
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+    
+    Supports `in` and add() like a set, at a fraction of the memory, with a
+    small false-positive rate (an unseen URL may be reported as processed)
+    and no false negatives.
+    
+    Args:
+        capacity (int): Expected number of items
+        error_rate (float): Target false-positive rate at capacity
+    """
+    
+    _HEADER = struct.Struct(">QQQ")  # bits, hashes, count
+    
+    def __init__(self, capacity: int = 100000, error_rate: float = 0.001):
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.count = 0
+        self.bits = bytearray((self.num_bits + 7) // 8)
+    
+    def _positions(self, item: str):
+        # Double hashing (Kirsch-Mitzenmacher) off one 128-bit digest
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+    
+    def add(self, item: str) -> None:
+        added = False
+        for pos in self._positions(item):
+            mask = 1 << (pos & 7)
+            if not self.bits[pos >> 3] & mask:
+                self.bits[pos >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+    
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def to_bytes(self) -> bytes:
+        return self._HEADER.pack(self.num_bits, self.num_hashes, self.count) + bytes(self.bits)
+    
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> "BloomFilter":
+        bloom = cls.__new__(cls)
+        bloom.num_bits, bloom.num_hashes, bloom.count = cls._HEADER.unpack_from(raw)
+        bloom.bits = bytearray(raw[cls._HEADER.size:])
+        if len(bloom.bits) != (bloom.num_bits + 7) // 8:
+            raise ValueError("Truncated bloom filter file")
+        return bloom
+
+
+class ScalableBloomFilter:
+    """
+    Bloom filter that grows instead of degrading past its capacity.
+    
+    Items go into the newest BloomFilter layer; when it reaches capacity a
+    new layer is added with twice the capacity and half the error rate, so
+    the overall false-positive rate stays below about 2x error_rate however
+    many URLs accumulate. Membership checks every layer.
+    
+    Args:
+        capacity (int): Capacity of the first layer
+        error_rate (float): False-positive rate of the first layer
     """
-    Load set of already-processed URLs.
+    
+    _MAGIC = b"SBF1"
+    _LAYER = struct.Struct(">QdQ")  # capacity, error rate, byte length
+    
+    def __init__(self, capacity: int = 100000, error_rate: float = 0.001):
+        self.layers = []  # (capacity, error_rate, BloomFilter)
+        self._add_layer(capacity, error_rate)
+    
+    def _add_layer(self, capacity: int, error_rate: float) -> None:
+        self.layers.append((capacity, error_rate, BloomFilter(capacity, error_rate)))
+    
+    def add(self, item: str) -> None:
+        if item in self:
+            return
+        capacity, error_rate, bloom = self.layers[-1]
+        if bloom.count >= capacity:
+            self._add_layer(capacity * 2, error_rate / 2)
+            bloom = self.layers[-1][2]
+        bloom.add(item)
+    
+    def __contains__(self, item: str) -> bool:
+        return any(item in bloom for _, _, bloom in self.layers)
+    
+    def __len__(self) -> int:
+        return sum(bloom.count for _, _, bloom in self.layers)
+    
+    def to_bytes(self) -> bytes:
+        parts = [self._MAGIC, struct.pack(">I", len(self.layers))]
+        for capacity, error_rate, bloom in self.layers:
+            raw = bloom.to_bytes()
+            parts.append(self._LAYER.pack(capacity, error_rate, len(raw)))
+            parts.append(raw)
+        return b"".join(parts)
+    
+    @classmethod
+    def from_bytes(cls, raw: bytes, capacity: int = 100000,
+                   error_rate: float = 0.001) -> "ScalableBloomFilter":
+        """
+        Rebuild a filter from to_bytes() output. A plain BloomFilter file
+        (the earlier format) becomes the first layer, assumed to have the
+        given capacity and error rate.
+        """
+        sbf = cls.__new__(cls)
+        if not raw.startswith(cls._MAGIC):
+            sbf.layers = [(capacity, error_rate, BloomFilter.from_bytes(raw))]
+            return sbf
+        view = memoryview(raw)
+        offset = len(cls._MAGIC)
+        (num_layers,) = struct.unpack_from(">I", raw, offset)
+        offset += 4
+        sbf.layers = []
+        for _ in range(num_layers):
+            layer_capacity, layer_error, length = cls._LAYER.unpack_from(raw, offset)
+            offset += cls._LAYER.size
+            bloom = BloomFilter.from_bytes(bytes(view[offset:offset + length]))
+            offset += length
+            sbf.layers.append((layer_capacity, layer_error, bloom))
+        if not sbf.layers:
+            raise ValueError("Empty bloom filter file")
+        return sbf
+
+
+def load_processed() -> ScalableBloomFilter:
+    """
+    Load the filter of already-processed URLs.
+    
+    Reads PROCESSED_BLOOM_FILE (on first run after upgrading, seeds the
+    filter from the legacy PROCESSED_FILE JSON list), then replays and
+    compacts any URLs appended to PROCESSED_LOG_FILE by a run that didn't
+    finish.
     
     Returns:
-        set: Set of URLs that have already been processed
+        ScalableBloomFilter: Set-like filter of URLs that have already been processed
     """
-    if os.path.exists(PROCESSED_FILE):
+    urls = None
+    if os.path.exists(PROCESSED_BLOOM_FILE):
         try:
-            return set(json.load(open(PROCESSED_FILE)))
-        except:
-            pass
-    return set()
+            with open(PROCESSED_BLOOM_FILE, "rb") as f:
+                urls = ScalableBloomFilter.from_bytes(
+                    f.read(), PROCESSED_BLOOM_CAPACITY, PROCESSED_BLOOM_ERROR_RATE
+                )
+        except Exception as e:
+            logger.warning(f"Could not read {PROCESSED_BLOOM_FILE}: {e}")
+    
+    if urls is None:
+        urls = ScalableBloomFilter(PROCESSED_BLOOM_CAPACITY, PROCESSED_BLOOM_ERROR_RATE)
+        if os.path.exists(PROCESSED_FILE):
+            try:
+                for url in read_json_file(PROCESSED_FILE):
+                    urls.add(url)
+            except (OSError, ValueError, TypeError) as e:
+                logger.debug(f"Ignoring unreadable {PROCESSED_FILE}: {e}")
+    
+    if os.path.exists(PROCESSED_LOG_FILE):
+        with open(PROCESSED_LOG_FILE, "r", encoding="utf-8") as f:
+            for line in f:
+                url = line.rstrip("\n")
+                if url:
+                    urls.add(url)
+        # A leftover log means the last run didn't finish; compact it into
+        # the filter now so repeated crashes can't grow it without bound
+        save_processed(urls)
+    return urls
+
+
+def open_processed_log():
+    """
+    Open the append-only processed-URL log.
+    
+    Line buffered, so each URL written is on disk before the next article
+    is processed and survives a crash mid-run.
+    
+    Returns:
+        file: Text file handle opened for appending
+    """
+    return open(PROCESSED_LOG_FILE, "a", encoding="utf-8", buffering=1)
+
+
+def mark_processed(urls: ScalableBloomFilter, log, url: str) -> None:
+    """
+    Record a URL as processed in memory and in the append-only log.
+    
+    Its canonical_url() key is recorded too, so the same article reached
+    later through a different link (tracking parameters, www., trailing
+    slash) is recognized without another LLM call.
+    
+    Args:
+        urls (ScalableBloomFilter): Filter of processed URLs
+        log (file): Handle from open_processed_log()
+        url (str): Article URL
+    """
+    urls.add(url)
+    log.write(url + "\n")
+    key = canonical_url(url)
+    if key != url:
+        urls.add(key)
+        log.write(key + "\n")
 
 
-def save_processed(urls: set):
+def save_processed(urls: ScalableBloomFilter):
     """
     Save processed URLs to file.
     
+    Folds everything into PROCESSED_BLOOM_FILE and clears the
+    append-only log, whose entries are now part of the filter.
+    
     Args:
-        urls (set): Set of URLs to save
+        urls (ScalableBloomFilter): Filter of processed URLs
     """
-    json.dump(list(urls), open(PROCESSED_FILE, "w"), indent=2)
+    tmp = PROCESSED_BLOOM_FILE + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(urls.to_bytes())
+    os.replace(tmp, PROCESSED_BLOOM_FILE)
+    if os.path.exists(PROCESSED_LOG_FILE):
+        os.remove(PROCESSED_LOG_FILE)
 
 
-def get_wp_categories(auth) -> Dict[int, Dict]:
+def _get_wp_terms(auth, kind: str) -> Dict[int, Dict]:
     """
-    Fetch all WordPress categories for the site.
+    Fetch a WordPress term collection ("categories" or "tags") with revalidation.
     
-    Uses WP REST API to get categories, caches results in wp_cache.
+    wp_cache[kind] holds {"ts", "ttl", "pages", "etag", "last_modified",
+    "data", "by_name"}, where by_name maps casefolded term names to IDs
+    (see wp_term_id).
+    Within WP_TERMS_TTL seconds the cached data is returned directly; after
+    that the request is conditional, and a 304 reuses the cached data
+    without downloading or parsing the collection again. Collections
+    larger than one page are fetched in full, with pages 2..N requested
+    concurrently once X-WP-TotalPages is known.
     
     Args:
         auth (dict): Authentication configuration with 'api_base', 'user', 'password'
+        kind (str): REST collection name
     
     Returns:
-        dict: Category ID -> category data mapping
+        dict: Term ID -> term data mapping
     """
-    global wp_cache
-    
-    # Check cache first
-    if "categories" in wp_cache:
-        return wp_cache["categories"]
-    
-    # Fetch from WordPress
-    api_base = auth.get("api_base", WP_API_BASE)
-    user = auth.get("user", WP_USER)
-    password = auth.get("password", WP_APP_PASSWORD)
+    entry = wp_cache_get(kind)
+    if entry is not None and "data" not in entry:
+        # Legacy cache format: bare id -> term mapping with no validators
+        entry = {"data": entry}
+    if wp_cache_fresh(entry):
+        return entry["data"]
+    
+    api_base, http_auth = _resolve_auth(auth)
+    
+    headers = {}
+    # Validators cover the first page only, so only revalidate collections
+    # that fit on one page
+    if entry and entry.get("pages", 1) == 1:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
     
     try:
-        resp = requests.get(
-            f"{api_base}/wp/v2/categories",
-            auth=(user, password),
-            params={"per_page": 100}
+        resp = _SESSION.get(
+            f"{api_base}/wp/v2/{kind}",
+            auth=http_auth,
+            params={"per_page": 100},
+            headers=headers,
+            timeout=WP_TIMEOUT
         )
+        if resp.status_code == 304 and entry:
+            entry["ts"] = time.time()
+            entry["ttl"] = WP_TERMS_TTL
+            wp_cache_put(kind, entry)
+            return entry["data"]
         if resp.status_code == 200:
-            categories = {cat["id"]: cat for cat in resp.json()}
-            wp_cache["categories"] = categories
-            return categories
+            pages = [response_json(resp)]
+            total_pages = int(resp.headers.get("X-WP-TotalPages", "1") or 1)
+            if total_pages > 1:
+                # Remaining pages are independent - fetch them in parallel
+                def fetch_page(page):
+                    r = _SESSION.get(
+                        f"{api_base}/wp/v2/{kind}",
+                        auth=http_auth,
+                        params={"per_page": 100, "page": page},
+                        timeout=WP_TIMEOUT
+                    )
+                    r.raise_for_status()
+                    return response_json(r)
+                with ThreadPoolExecutor(max_workers=min(4, total_pages - 1)) as ex:
+                    pages.extend(ex.map(fetch_page, range(2, total_pages + 1)))
+            data = {term["id"]: term for page in pages for term in page}
+            wp_cache_put(kind, {
+                "ts": time.time(),
+                "ttl": WP_TERMS_TTL,
+                "pages": total_pages,
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+                "data": data,
+                "by_name": _index_terms_by_name(data.values())
+            })
+            return data
     except Exception as e:
-        print(f"Error fetching categories: {e}")
+        logger.error(f"Error fetching {kind}: {e}")
+    
+    # Fall back to whatever we had cached
+    return entry["data"] if entry else {}
+
+
+def get_wp_categories(auth) -> Dict[int, Dict]:
+    """
+    Fetch all WordPress categories for the site.
     
-    return {}
+    Uses WP REST API to get categories, caches results in wp_cache and
+    revalidates them with ETag/Last-Modified on later calls.
+    
+    Args:
+        auth (dict): Authentication configuration with 'api_base', 'user', 'password'
+    
+    Returns:
+        dict: Category ID -> category data mapping
+    """
+    return _get_wp_terms(auth, "categories")
 
 
 def get_wp_tags(auth) -> Dict[int, Dict]:
@@ -447,47 +1092,164 @@ def get_wp_tags(auth) -> Dict[int, Dict]:
     Returns:
         dict: Tag ID -> tag data mapping
     """
-    global wp_cache
-    
-    if "tags" in wp_cache:
-        return wp_cache["tags"]
+    return _get_wp_terms(auth, "tags")
+
+
+def _term_name_key(name: str) -> str:
+    """Normalize a term name for lookup; the REST API returns names HTML-escaped."""
+    return html.unescape(name).strip().casefold()
+
+
+def _index_terms_by_name(terms) -> Dict[str, int]:
+    """Build a name -> ID index for a collection of REST term objects."""
+    return {_term_name_key(term.get("name", "")): term["id"] for term in terms}
+
+
+def wp_term_id(kind: str, name: str) -> Optional[int]:
+    """
+    Look up a cached category or tag ID by name, without any request.
     
-    api_base = auth.get("api_base", WP_API_BASE)
-    user = auth.get("user", WP_USER)
-    password = auth.get("password", WP_APP_PASSWORD)
+    Args:
+        kind (str): "categories" or "tags"
+        name (str): Term name (case-insensitive)
     
+    Returns:
+        int: Term ID, or None if the term is not in the cache
+    """
+    entry = wp_cache.get(kind)
+    if not entry or "data" not in entry:
+        return None
+    if "by_name" not in entry:
+        entry["by_name"] = _index_terms_by_name(entry["data"].values())
+    return entry["by_name"].get(_term_name_key(name))
+
+
+def _remember_wp_term(kind: str, term_id: int, name: str) -> None:
+    """Add a newly created or discovered term to the name index."""
+    entry = wp_cache.get(kind)
+    if entry and "by_name" in entry:
+        entry["by_name"][_term_name_key(name)] = term_id
+
+
+def _brave_cache_path(query: str, count: int) -> str:
+    """Cache file for a Brave query; the UTC day is part of the key."""
+    day = time.strftime("%Y-%m-%d", time.gmtime())
+    key = cache_digest(f"{query}\n{count}\n{day}")
+    return os.path.join(BRAVE_CACHE_DIR, f"{key}.json")
+
+
+def _brave_cache_read(path: str) -> Optional[List[Dict]]:
+    """Return cached articles younger than BRAVE_CACHE_TTL, else None."""
+    if not BRAVE_CACHE_ENABLED:
+        return None
     try:
-        resp = requests.get(
-            f"{api_base}/wp/v2/tags",
-            auth=(user, password),
-            params={"per_page": 100}
-        )
-        if resp.status_code == 200:
-            tags = {tag["id"]: tag for tag in resp.json()}
-            wp_cache["tags"] = tags
-            return tags
-    except Exception as e:
-        print(f"Error fetching tags: {e}")
+        if time.time() - os.path.getmtime(path) >= BRAVE_CACHE_TTL:
+            return None
+        return read_json_file(path)
+    except (OSError, ValueError):
+        return None
+
+
+def _brave_cache_write(path: str, articles: List[Dict]) -> None:
+    """Atomically store articles in the Brave cache."""
+    try:
+        os.makedirs(BRAVE_CACHE_DIR, exist_ok=True)
+        write_json_file(path, articles)
+    except OSError as e:
+        logger.warning(f"Brave cache write error: {e}")
+
+
+@functools.lru_cache(maxsize=1024)
+def is_skipped_host(host: str) -> bool:
+    """True if host is in SKIP_DOMAINS or is a subdomain of an entry."""
+    labels = host.lower().rstrip(".").split(".")
+    return any(".".join(labels[i:]) in SKIP_DOMAINS for i in range(len(labels) - 1))
+
+
+class BraveKeyPool:
+    """
+    Hands out Brave API keys under a per-key token bucket.
+    
+    Each key earns one request every BRAVE_MIN_INTERVAL seconds, holding
+    at most BRAVE_KEY_BURST. acquire() picks whichever key can be used
+    soonest (least recently used on ties) and sleeps only if none is ready,
+    so concurrent searches spread over all keys without tripping 429s.
+    """
     
-    return {}
+    def __init__(self, keys: List[str], interval: float = None, burst: int = None):
+        interval = BRAVE_MIN_INTERVAL if interval is None else interval
+        self.rate = 1.0 / interval if interval > 0 else math.inf
+        self.burst = float(BRAVE_KEY_BURST if burst is None else burst)
+        now = time.monotonic()
+        # dict.fromkeys drops duplicate keys but keeps their order
+        self.keys = list(dict.fromkeys(keys)) or [""]
+        self._tokens = {key: self.burst for key in self.keys}
+        self._stamp = {key: now for key in self.keys}
+        self._last_used = {key: 0.0 for key in self.keys}
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> str:
+        """Block until some key has a token, spend it and return the key."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                best, best_wait = None, math.inf
+                for key in self.keys:
+                    if self.rate == math.inf:
+                        tokens = self.burst
+                    else:
+                        tokens = min(self.burst, self._tokens[key] + (now - self._stamp[key]) * self.rate)
+                    self._tokens[key], self._stamp[key] = tokens, now
+                    wait = 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+                    if (wait, self._last_used[key]) < (best_wait, self._last_used.get(best, math.inf)):
+                        best, best_wait = key, wait
+                if best_wait <= 0:
+                    self._tokens[best] -= 1
+                    self._last_used[best] = now
+                    return best
+            time.sleep(best_wait)
+
+
+@functools.lru_cache(maxsize=1)
+def default_brave_key_pool() -> BraveKeyPool:
+    """Key pool over BRAVE_API_KEYS_JSON, falling back to BRAVE_API_KEY."""
+    try:
+        keys = [key for key in json.loads(BRAVE_API_KEYS_JSON) if key]
+    except ValueError:
+        logger.warning("BRAVE_API_KEYS_JSON is not valid JSON; using BRAVE_API_KEY")
+        keys = []
+    return BraveKeyPool(keys or [BRAVE_API_KEY])
 
 
-def search_brave(query: str, api_key: str, count: int = 10, days_back: int = 7) -> List[Dict]:
+def search_brave(query: str, api_key: str = None, count: int = 10, days_back: int = 7,
+                 key_pool: BraveKeyPool = None) -> List[Dict]:
     """
     Search Brave News API for articles matching query.
     
     Uses Brave Search API to find news articles. Results include title,
     description, URL, and published date. Filters to only recent articles.
+    Results are cached on disk for BRAVE_CACHE_TTL seconds (same day only).
+    Without an explicit api_key, a key is taken from key_pool (or the
+    default pool) only on a cache miss, so cached queries cost no quota.
     
     Args:
         query (str): Search query string
-        api_key (str): Brave API key
+        api_key (str, optional): Brave API key to use as-is
         count (int): Number of results to fetch (default: 10)
         days_back (int): Only return articles from last N days
+        key_pool (BraveKeyPool, optional): Rate-limited keys to draw from
     
     Returns:
         list: List of article dictionaries
     """
+    cache_path = _brave_cache_path(query, count)
+    cached = _brave_cache_read(cache_path)
+    if cached is not None:
+        return cached
+    
+    if api_key is None:
+        api_key = (key_pool or default_brave_key_pool()).acquire()
+    
     try:
         # Brave News API endpoint (different from web search)
         url = "https://api.search.brave.com/res/v1/news/search"
@@ -504,21 +1266,20 @@ def search_brave(query: str, api_key: str, count: int = 10, days_back: int = 7)
             "freshness": "pw"  # Past week - works with Brave API
         }
         
-        resp = requests.get(url, headers=headers, params=params, timeout=30)
+        resp = _SESSION.get(url, headers=headers, params=params, timeout=30)
         
         if resp.status_code == 200:
-            data = resp.json()
+            data = response_json(resp)
             results = data.get("results", [])
             
             articles = []
             for item in results:
-                domain = item.get("domain", "")
+                # Domains repeat heavily across results - share one string each
+                domain = sys.intern(item.get("domain", ""))
                 url = item.get("url", "")
                 
                 # Skip Reddit and other unwanted sources
-                skip_domains = ["reddit.com", "old.reddit.com", "new.reddit.com", 
-                               "youtu.be", "instagram.com", "tiktok.com", "twitter.com", "x.com"]
-                if any(d in domain.lower() or d in url.lower() for d in skip_domains):
+                if is_skipped_host(domain) or is_skipped_host(urlsplit(url).hostname or ""):
                     continue
                 
                 # Extract image from various possible fields
@@ -537,127 +1298,442 @@ def search_brave(query: str, api_key: str, count: int = 10, days_back: int = 7)
                 }
                 articles.append(article)
             
+            _brave_cache_write(cache_path, articles)
             return articles
         
     except Exception as e:
-        print(f"Brave API error for '{query}': {e}")
+        logger.error(f"Brave API error for '{query}': {e}")
     
     return []
 
 
-def fetch_rss_feeds(count: int = 10, category_filter: str = None) -> List[Dict]:
-    """Fetch articles from RSS feeds."""
-    articles = []
+def prefetch_brave(queries: List[str], brave_keys: List[str], count: int = 10) -> List[Future]:
+    """
+    Start Brave searches for all queries concurrently.
     
-    # Filter feeds if category specified
-    feeds = RSS_FEEDS
-    if category_filter:
-        feeds = [f for f in RSS_FEEDS if f.get("category", "").lower() == category_filter.lower()]
+    Searches draw keys from one BraveKeyPool, so each request goes to
+    whichever key has rate budget left rather than a fixed round-robin
+    slot. The pool, not the worker count, enforces the rate limit, so
+    there are up to BRAVE_PREFETCH_WORKERS workers: cached queries finish
+    immediately instead of queueing behind searches waiting for a token.
+    Results are returned as futures in query order so callers can
+    consume them while later searches are still in flight.
+    
+    Args:
+        queries (list): Search queries
+        brave_keys (list): Brave API keys to spread requests over
+        count (int): Number of results per query
     
-    for feed in feeds[:10]:  # Limit to 10 feeds
+    Returns:
+        list: One Future per query resolving to its article list
+    """
+    key_pool = BraveKeyPool(brave_keys)
+    executor = ThreadPoolExecutor(max_workers=max(1, min(BRAVE_PREFETCH_WORKERS, len(queries))))
+    futures = [
+        executor.submit(search_brave, query, count=count, key_pool=key_pool)
+        for query in queries
+    ]
+    # Queued searches keep running; this only releases the workers when done
+    executor.shutdown(wait=False)
+    return futures
+
+
+def _rss_text(elem, tag: str) -> str:
+    """Stripped text of a child element, or "" if missing."""
+    return (elem.findtext(tag) or "").strip()
+
+
+def _strip_html(fragment: str) -> str:
+    """Plain text of an HTML fragment such as an RSS description."""
+    if not fragment:
+        return ""
+    if lxml_html is not None:
         try:
-            resp = requests.get(feed["url"], timeout=15)
-            if resp.status_code != 200:
+            return lxml_html.fromstring(fragment).text_content()
+        except (ValueError, etree.ParserError):
+            pass
+    return html.unescape(_HTML_TAG_RE.sub("", fragment))
+
+
+def parse_rss_items(stream, feed: Dict, limit: int = 5) -> List[Dict]:
+    """
+    Incrementally parse up to limit <item> entries from an RSS stream.
+    
+    Each item is cleared once read so memory stays flat regardless of
+    feed size, and parsing stops as soon as limit items are collected.
+    A feed that turns malformed part way keeps the items read so far.
+    
+    Args:
+        stream: File-like object with the raw feed bytes
+        feed (dict): RSS_FEEDS entry the stream came from
+        limit (int): Maximum number of items to return
+    
+    Returns:
+        list: Article dicts in the same shape as search_brave results
+    """
+    articles = []
+    try:
+        for _, elem in etree.iterparse(stream, events=("end",)):
+            if elem.tag != "item":
                 continue
+            title = _rss_text(elem, "title")
+            link = _rss_text(elem, "link")
+            desc = _strip_html(_rss_text(elem, "description"))[:300]
+            pub_date = _rss_text(elem, "pubDate")
+            elem.clear()
             
-            # Simple XML parsing
-            content = resp.text
+            # Parse date
+            post_date = None
+            if pub_date:
+                try:
+                    dt_obj = parsedate_to_datetime(pub_date)
+                    post_date = dt_obj.strftime("%Y-%m-%dT%H:%M:%S")
+                except (TypeError, ValueError):
+                    pass
             
-            # Extract items (basic parsing)
-            items = re.findall(r'<item>(.*?)</item>', content, re.DOTALL)
+            if title and link:
+                articles.append({
+                    "title": title,
+                    "description": desc,
+                    "url": link,
+                    "age": pub_date,
+                    "domain": feed["name"],
+                    "image": "",
+                    "published_time": post_date or "",
+                    "source": "rss",
+                    "feed_category": feed.get("category", "")
+                })
             
-            for item_xml in items[:5]:  # 5 items per feed
-                try:
-                    title = re.search(r'<title><!\[CDATA\[(.*?)\]\]></title>', item_xml)
-                    if not title:
-                        title = re.search(r'<title>(.*?)</title>', item_xml)
-                    title = title.group(1) if title else ""
-                    
-                    link = re.search(r'<link>(.*?)</link>', item_xml)
-                    link = link.group(1) if link else ""
-                    
-                    desc = re.search(r'<description><!\[CDATA\[(.*?)\]\]></description>', item_xml)
-                    if not desc:
-                        desc = re.search(r'<description>(.*?)</description>', item_xml)
-                    desc = desc.group(1) if desc else ""
-                    # Strip HTML
-                    desc = re.sub(r'<[^>]+>', '', desc)[:300]
-                    
-                    pub_date = re.search(r'<pubDate>(.*?)</pubDate>', item_xml)
-                    pub_date = pub_date.group(1) if pub_date else ""
-                    
-                    # Parse date
-                    post_date = None
-                    if pub_date:
-                        try:
-                            from email.utils import parsedate_to_datetime
-                            dt_obj = parsedate_to_datetime(pub_date)
-                            post_date = dt_obj.strftime("%Y-%m-%dT%H:%M:%S")
-                        except:
-                            pass
-                    
-                    if title and link:
-                        articles.append({
-                            "title": title,
-                            "description": desc,
-                            "url": link,
-                            "age": pub_date,
-                            "domain": feed["name"],
-                            "image": "",
-                            "published_time": post_date or "",
-                            "source": "rss",
-                            "feed_category": feed.get("category", "")
-                        })
-                except Exception as e:
-                    continue
-        
-        except Exception as e:
-            continue
-    
+            if len(articles) >= limit:  # 5 items per feed
+                break
+    except etree.ParseError as e:
+        logger.debug(f"RSS parse stopped early for {feed['name']}: {e}")
     return articles
 
 
-def generate_with_llm(prompt: str, base_url: str = None, model: str = None) -> str:
+def _fetch_rss_feed(feed: Dict) -> List[Dict]:
+    """Fetch and parse one RSS feed, returning [] on any failure."""
+    try:
+        resp = _SESSION.get(feed["url"], stream=True, timeout=15)
+    except requests.RequestException:
+        return []
+    with resp:
+        if resp.status_code != 200:
+            return []
+        # Let urllib3 undo gzip/deflate while the parser reads
+        resp.raw.decode_content = True
+        try:
+            return parse_rss_items(resp.raw, feed)
+        except Exception as e:
+            logger.debug(f"RSS read failed for {feed['name']}: {e}")
+            return []
+
+
+def fetch_rss_feeds(count: int = 10, category_filter: str = None) -> List[Dict]:
     """
-    Generate text using local LLM (llama.cpp via OpenAI-compatible API).
+    Fetch articles from RSS feeds.
     
-    Sends a prompt to the local LLM server and returns the generated text.
-    Falls back gracefully if LLM is unavailable.
-    
-    Args:
-        prompt (str): Input prompt for the LLM
-        base_url (str, optional): Override LLM base URL
-        model (str, optional): Override model name
-    
-    Returns:
-        str: Generated text or empty string on failure
+    Feeds are fetched concurrently on the shared session; results keep
+    feed order so output matches a sequential fetch.
     """
-    url = (base_url or LOCAL_LLM_BASE_URL) + "/v1/chat/completions"
-    model_name = model or LOCAL_LLM_MODEL
+    articles = []
     
-    try:
-        resp = requests.post(
-            url,
-            json={
-                "model": model_name,
-                "messages": [
-                    {"role": "system", "content": "You are a professional news writer."},
-                    {"role": "user", "content": prompt}
-                ],
-                "temperature": 0.7,
-                "max_tokens": 2000
-            },
-            timeout=120
-        )
-        
-        if resp.status_code == 200:
-            data = resp.json()
-            return data["choices"][0]["message"]["content"]
+    # Filter feeds if category specified
+    feeds = RSS_FEEDS
+    if category_filter:
+        feeds = [f for f in RSS_FEEDS if f.get("category", "").lower() == category_filter.lower()]
+    feeds = feeds[:10]  # Limit to 10 feeds
+    if not feeds:
+        return articles
     
-    except Exception as e:
-        print(f"LLM generation error: {e}")
+    with ThreadPoolExecutor(max_workers=len(feeds)) as executor:
+        for feed_articles in executor.map(_fetch_rss_feed, feeds):
+            articles.extend(feed_articles)
     
-    return ""
+    return articles
+
+
+def llm_cache_key(title: str, description: str) -> str:
+    """
+    Content hash identifying an article for the LLM cache.
+    
+    Syndicated stories often arrive under several URLs with the same
+    title and description; they share a key and so a single rewrite.
+    The prompt itself is not hashed because it carries a randomly chosen
+    brand tone, which would make most lookups miss.
+    """
+    return cache_digest(f"{title}\n{description}")
+
+
+def llm_cache_get(key: str) -> Optional[str]:
+    """Return a cached LLM rewrite, or None."""
+    if not LLM_CACHE_ENABLED:
+        return None
+    try:
+        with open(os.path.join(LLM_CACHE_DIR, f"{key}.txt"), "r", encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def llm_cache_put(key: str, text: str) -> None:
+    """Atomically store an LLM rewrite."""
+    try:
+        os.makedirs(LLM_CACHE_DIR, exist_ok=True)
+        path = os.path.join(LLM_CACHE_DIR, f"{key}.txt")
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning(f"LLM cache write error: {e}")
+
+
+@functools.lru_cache(maxsize=1)
+def _semantic_model():
+    """Load the sentence embedding model once, on first use."""
+    return SentenceTransformer(LLM_SEMANTIC_MODEL)
+
+
+class SemanticIndex:
+    """
+    Embeddings of cached LLM inputs, for nearest-neighbour cache lookups.
+    
+    Rows are unit-normalized, so a matrix-vector product gives cosine
+    similarities. Each row points at an exact-cache key whose rewrite is
+    stored by llm_cache_put; the index itself is saved as an .npz file.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.keys: List[str] = []
+        self.matrix = None
+        self.dirty = False
+        self._lock = threading.Lock()
+        try:
+            with np.load(path) as data:
+                self.keys = [str(k) for k in data["keys"]]
+                self.matrix = data["matrix"]
+        except (OSError, KeyError, ValueError):
+            pass
+    
+    @staticmethod
+    def embed(texts: List[str]):
+        """Normalized embeddings for texts, one row per text, in batches of 32."""
+        return _semantic_model().encode(
+            texts, batch_size=32, convert_to_numpy=True, normalize_embeddings=True
+        )
+    
+    def lookup(self, vector) -> Optional[str]:
+        """Cache key of the closest entry at or above the threshold, if any."""
+        with self._lock:
+            if self.matrix is None or not len(self.keys):
+                return None
+            sims = self.matrix @ vector
+            best = int(sims.argmax())
+            return self.keys[best] if sims[best] >= LLM_SEMANTIC_THRESHOLD else None
+    
+    def add(self, key: str, vector) -> None:
+        """Record that key's rewrite was generated from text embedding to vector."""
+        with self._lock:
+            row = vector.reshape(1, -1).astype(np.float32)
+            self.matrix = row if self.matrix is None else np.vstack((self.matrix, row))
+            self.keys.append(key)
+            self.dirty = True
+    
+    def save(self) -> None:
+        """Atomically write the index if it changed."""
+        with self._lock:
+            if not self.dirty:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                tmp = f"{self.path}.{os.getpid()}.tmp.npz"
+                np.savez(tmp, keys=np.array(self.keys), matrix=self.matrix)
+                os.replace(tmp, self.path)
+                self.dirty = False
+            except OSError as e:
+                logger.warning(f"Semantic cache write error: {e}")
+
+
+_SEMANTIC_INDEXES: Dict[str, SemanticIndex] = {}
+_SEMANTIC_GUARD = threading.Lock()
+
+
+def semantic_index(model_name: str) -> Optional[SemanticIndex]:
+    """
+    The semantic index for an LLM model, or None if the feature is off.
+    
+    Each LLM model gets its own index, like the exact cache keys.
+    """
+    if not (LLM_SEMANTIC_CACHE and LLM_CACHE_ENABLED and SentenceTransformer is not None):
+        return None
+    with _SEMANTIC_GUARD:
+        if model_name not in _SEMANTIC_INDEXES:
+            path = os.path.join(LLM_CACHE_DIR, f"semantic-{cache_digest(model_name)}.npz")
+            _SEMANTIC_INDEXES[model_name] = SemanticIndex(path)
+        return _SEMANTIC_INDEXES[model_name]
+
+
+def article_semantic_text(article: Dict) -> str:
+    """Text of an article that the semantic cache compares."""
+    return f"{article.get('title', '')}\n{article.get('description', '')}"
+
+
+def save_semantic_indexes() -> None:
+    """Persist every semantic index loaded this run."""
+    for index in list(_SEMANTIC_INDEXES.values()):
+        index.save()
+
+
+_LLM_PROMPT_SLOT = b'"__PROMPT__"'
+
+
+# Default system prompt for generate_with_llm
+LLM_SYSTEM_PROMPT = "You are a professional news writer."
+
+# System prompt for article rewrites. It holds everything that is the same
+# for every article, so the request prefix is byte-identical across calls
+# and llama.cpp's prompt cache (or a provider's) can reuse it; the brand
+# tone and article details follow in the user message.
+REWRITE_SYSTEM_PROMPT = """You are a professional news writer. You are a tech journalist. Follow the tone guidance and rewrite the article details given by the user.
+
+Generate output in this EXACT format (4 lines):
+HEADLINE: [Your new catchy SEO-friendly headline, max 60 chars]
+META: [Your SEO meta description, max 155 chars, include keywords]
+TAGS: [comma-separated list of 3-5 relevant tags/keywords for this article, like: dji, drone, camera, review, news]
+ARTICLE: [Your 2-3 paragraph article content]"""
+
+
+# One labelled line of the rewrite output (see REWRITE_SYSTEM_PROMPT)
+_LLM_LINE_RE = re.compile(r"^[ \t]*(HEADLINE|META|TAGS|ARTICLE):(.*)$", re.M)
+
+
+@functools.lru_cache(maxsize=8)
+def _llm_request_template(model_name: str, system_prompt: str) -> bytes:
+    """
+    JSON-encoded chat completion request for a model and system prompt,
+    with the user prompt left as a placeholder (_LLM_PROMPT_SLOT).
+    """
+    request = {
+        "model": model_name,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": "__PROMPT__"}
+        ],
+        "temperature": LLM_TEMPERATURE,
+        "max_tokens": LLM_MAX_TOKENS,
+        "stop": list(LLM_STOP),
+        "stream": True
+    }
+    if LLM_SEED:
+        request["seed"] = int(LLM_SEED)
+    if LLM_CACHE_PROMPT:
+        # llama.cpp extension: keep the shared prompt prefix in the KV
+        # cache so only the article-specific tail is evaluated
+        request["cache_prompt"] = True
+    return orjson.dumps(request) if orjson else json.dumps(request).encode("utf-8")
+
+
+def generate_with_llm(prompt: str, base_url: str = None, model: str = None,
+                      cache_key: str = None, semantic_text: str = None,
+                      semantic_vector=None, system: str = None) -> str:
+    """
+    Generate text using local LLM (llama.cpp via OpenAI-compatible API).
+    
+    Sends a prompt to the local LLM server and returns the generated text.
+    The completion is streamed (server-sent events) and assembled from the
+    content deltas; servers that ignore "stream" and reply with a single
+    JSON body are handled too. Falls back gracefully if LLM is unavailable.
+    
+    With a cache_key, an earlier completion stored under that key for the
+    same model is returned without calling the server, and a new non-empty
+    completion is stored for next time. If that misses and the semantic
+    cache is on, a completion for text similar to semantic_text is reused.
+    
+    Args:
+        prompt (str): Input prompt for the LLM
+        base_url (str, optional): Override LLM base URL
+        model (str, optional): Override model name
+        cache_key (str, optional): Key for the on-disk response cache
+            (see llm_cache_key)
+        semantic_text (str, optional): Article text to match semantically
+            when the exact cache misses
+        semantic_vector (optional): Precomputed embedding of semantic_text
+            (see SemanticIndex.embed), so callers can embed in batches
+        system (str, optional): System prompt (default: LLM_SYSTEM_PROMPT)
+    
+    Returns:
+        str: Generated text or empty string on failure
+    """
+    url = (base_url or LOCAL_LLM_BASE_URL) + "/v1/chat/completions"
+    model_name = model or LOCAL_LLM_MODEL
+    
+    if cache_key is not None:
+        # A different model must not reuse another model's rewrite
+        cache_key = cache_digest(f"{model_name}\n{cache_key}")
+        cached = llm_cache_get(cache_key)
+        if cached is not None:
+            return cached
+        
+        index = semantic_index(model_name) if semantic_text or semantic_vector is not None else None
+        vector = semantic_vector
+        if index is not None:
+            if vector is None:
+                vector = index.embed([semantic_text])[0]
+            similar_key = index.lookup(vector)
+            cached = llm_cache_get(similar_key) if similar_key else None
+            if cached is not None:
+                return cached
+        
+        generated = generate_with_llm(prompt, base_url, model, system=system)
+        if generated:
+            llm_cache_put(cache_key, generated)
+            if index is not None:
+                index.add(cache_key, vector)
+        return generated
+    
+    # Only the user prompt varies - splice its JSON encoding into the
+    # pre-encoded request body
+    encoded_prompt = orjson.dumps(prompt) if orjson else json.dumps(prompt).encode("utf-8")
+    body = _llm_request_template(model_name, system or LLM_SYSTEM_PROMPT).replace(_LLM_PROMPT_SLOT, encoded_prompt, 1)
+    
+    try:
+        with _SESSION.post(
+            url,
+            data=body,
+            headers={"Content-Type": "application/json"},
+            timeout=120,
+            stream=True
+        ) as resp:
+            if resp.status_code == 200:
+                if "text/event-stream" not in resp.headers.get("Content-Type", ""):
+                    data = response_json(resp)
+                    return data["choices"][0]["message"]["content"]
+                
+                parts = []
+                for line in resp.iter_lines():
+                    if not line.startswith(b"data:"):
+                        continue
+                    payload = line[5:].strip()
+                    if payload == b"[DONE]":
+                        break
+                    # Usage frames have no choices and some servers send
+                    # "delta": null; skip those (and undecodable frames)
+                    # rather than losing the parts collected so far
+                    try:
+                        chunk = orjson.loads(payload) if orjson else json.loads(payload)
+                    except ValueError:
+                        continue
+                    delta = (chunk.get("choices") or [{}])[0].get("delta") or {}
+                    if delta.get("content"):
+                        parts.append(delta["content"])
+                return "".join(parts)
+    
+    except Exception as e:
+        logger.error(f"LLM generation error: {e}")
+    
+    return ""
 
 
 def create_wp_post(auth: Dict, title: str, content: str, 
@@ -666,7 +1742,8 @@ def create_wp_post(auth: Dict, title: str, content: str,
                    seo_title: str = None, seo_description: str = None,
                    featured_image: str = None,
                    post_date: str = None,
-                   social_message: str = None) -> Optional[int]:
+                   social_message: str = None,
+                   featured_media: int = None) -> Optional[int]:
     """
 
     Create a new WordPress post.
@@ -686,13 +1763,13 @@ def create_wp_post(auth: Dict, title: str, content: str,
         featured_image (str): URL of featured image
         post_date (str): Publication date in ISO format (YYYY-MM-DDTHH:MM:SS)
         social_message (str): Social media message with hashtags
+        featured_media (int, optional): Media ID to set as the featured
+            image, saving a separate set_featured_image call
     
     Returns:
         int: Created post ID, or None on failure
     """
-    api_base = auth.get("api_base", WP_API_BASE)
-    user = auth.get("user", WP_USER)
-    password = auth.get("password", WP_APP_PASSWORD)
+    api_base, http_auth = _resolve_auth(auth)
     
     post_data = {
         "title": title,
@@ -706,6 +1783,9 @@ def create_wp_post(auth: Dict, title: str, content: str,
     if post_date:
         post_data["date"] = post_date
     
+    if featured_media:
+        post_data["featured_media"] = featured_media
+    
     # Build meta fields
     meta = {}
     
@@ -722,98 +1802,232 @@ def create_wp_post(auth: Dict, title: str, content: str,
         post_data["meta"] = meta
     
     try:
-        resp = requests.post(
+        resp = _SESSION.post(
             f"{api_base}/wp/v2/posts",
-            auth=(user, password),
-            json=post_data
+            auth=http_auth,
+            json=post_data,
+            timeout=WP_TIMEOUT
         )
         
         if resp.status_code in (200, 201):
-            return resp.json()["id"]
+            return response_json(resp)["id"]
         else:
-            print(f"WP create error: {resp.status_code} - {resp.text}")
+            logger.error(f"WP create error: {resp.status_code} - {resp.text}")
     
     except Exception as e:
-        print(f"WP API error: {e}")
+        logger.error(f"WP API error: {e}")
     
     return None
 
 
+# Largest source image the pipeline will upload (default 15 MB)
+MAX_IMG_BYTES = int(os.environ.get("MAX_IMG_BYTES", str(15 * 1024 * 1024)))
+
+# Image MIME subtype -> upload file extension (anything else is sent as jpg)
+_IMAGE_SUBTYPE_EXT = {"png": "png", "gif": "gif", "webp": "webp", "avif": "avif"}
+
+
 def upload_media_to_wp(auth: Dict, image_url: str, title: str = "", alt_text: str = "", caption: str = "", description: str = "") -> Optional[int]:
     """Upload image from URL to WordPress media library with full SEO metadata."""
     if not image_url:
         return None
     
-    api_base = auth.get("api_base", WP_API_BASE)
-    user = auth.get("user", WP_USER)
-    password = auth.get("password", WP_APP_PASSWORD)
+    api_base, http_auth = _resolve_auth(auth)
     
     try:
-        # Download image
-        img_resp = requests.get(image_url, timeout=30)
-        if img_resp.status_code != 200:
-            print(f"Failed to download image: {image_url}")
-            return None
-        
-        # Get file extension
-        ext = "jpg"
-        if "png" in img_resp.headers.get("Content-Type", ""):
-            ext = "png"
-        elif "gif" in img_resp.headers.get("Content-Type", ""):
-            ext = "gif"
-        
-        files = {
-            "file": (f"image.{ext}", img_resp.content, img_resp.headers.get("Content-Type", "image/jpeg"))
-        }
-        
-        # Build SEO data
-        data = {
-            "title": title or "Featured Image",
-            "alt_text": alt_text or title or "Creator Newsdesk image",
-            "caption": caption or title or "",
-            "description": description or title or "",
-        }
-        
-        resp = requests.post(
-            f"{api_base}/wp/v2/media",
-            auth=(user, password),
-            files=files,
-            data=data,
-            timeout=60
-        )
+        # Download image - streamed and piped straight into the upload when
+        # its size is known, so download overlaps upload
+        with _SESSION.get(image_url, timeout=30, stream=True) as img_resp:
+            if img_resp.status_code != 200:
+                logger.error(f"Failed to download image: {image_url}")
+                return None
+            
+            # Get file extension
+            content_type = img_resp.headers.get("Content-Type", "image/jpeg")
+            subtype = content_type.partition(";")[0].rpartition("/")[2].strip().lower()
+            ext = _IMAGE_SUBTYPE_EXT.get(subtype, "jpg")
+            
+            # Upload as a raw body, like the image worker; with no multipart
+            # form the SEO fields go in the query string
+            headers = {
+                "Content-Type": content_type,
+                "Content-Disposition": f'attachment; filename="image.{ext}"'
+            }
+            img_resp.raw.decode_content = True
+            
+            # Reject oversized images from the headers alone when the size
+            # is known, before downloading anything
+            length = img_resp.headers.get("Content-Length")
+            if (length and length.isdigit() and not img_resp.headers.get("Content-Encoding")
+                    and int(length) > MAX_IMG_BYTES):
+                logger.warning(f"Skipping image over {MAX_IMG_BYTES} bytes: {image_url}")
+                return None
+            # Either way read at most MAX_IMG_BYTES (+1 to detect overflow)
+            # and send bytes: requests can't size a raw urllib3 stream and
+            # would frame it as chunked, clashing with any Content-Length
+            body = img_resp.raw.read(MAX_IMG_BYTES + 1)
+            if len(body) > MAX_IMG_BYTES:
+                logger.warning(f"Skipping image over {MAX_IMG_BYTES} bytes: {image_url}")
+                return None
+            
+            # Build SEO data
+            params = {
+                "title": title or "Featured Image",
+                "alt_text": alt_text or title or "Creator Newsdesk image",
+                "caption": caption or title or "",
+                "description": description or title or "",
+            }
+            
+            resp = _SESSION.post(
+                f"{api_base}/wp/v2/media",
+                auth=http_auth,
+                headers=headers,
+                params=params,
+                data=body,
+                timeout=60
+            )
         
         if resp.status_code in (200, 201):
-            return resp.json()["id"]
+            return response_json(resp)["id"]
         else:
-            print(f"Media upload error: {resp.status_code}")
+            logger.error(f"Media upload error: {resp.status_code}")
             return None
     
     except Exception as e:
-        print(f"Media upload error: {e}")
+        logger.error(f"Media upload error: {e}")
         return None
 
 
-def set_featured_image(auth: Dict, post_id: int, media_id: int) -> bool:
-    """Set featured image for a post."""
-    api_base = auth.get("api_base", WP_API_BASE)
-    user = auth.get("user", WP_USER)
-    password = auth.get("password", WP_APP_PASSWORD)
+def set_featured_image(auth: Dict, post_id: int, media_id: int, status: str = None) -> bool:
+    """Set featured image for a post, optionally changing its status in the same request."""
+    api_base, http_auth = _resolve_auth(auth)
+    
+    update = {"featured_media": media_id}
+    if status:
+        update["status"] = status
     
     try:
-        resp = requests.post(
+        resp = _SESSION.post(
             f"{api_base}/wp/v2/posts/{post_id}",
-            auth=(user, password),
-            json={"featured_media": media_id}
+            auth=http_auth,
+            json=update,
+            timeout=WP_TIMEOUT
         )
         return resp.status_code in (200, 201)
     except Exception as e:
-        print(f"Set featured image error: {e}")
+        logger.error(f"Set featured image error: {e}")
         return False
 
 
+def share_to_socials(title: str, post_id: int, img_url: str) -> None:
+    """Post a published article to the configured social accounts."""
+    try:
+        post_url = f"https://www.creatornewsdesk.com/?p={post_id}"
+        social_results = social_poster.post_to_all_socials(
+            title,
+            post_url,
+            img_url
+        )
+        logger.info(f"  Social: {social_results}")
+    except Exception as e:
+        logger.error(f"  Social post error: {e}")
+
+
+def wait_for_social_posts() -> None:
+    """Block until every queued social share has finished."""
+    while _SOCIAL_JOBS:
+        _SOCIAL_JOBS.popleft().result()
+
+
+def publish_article(auth: Dict, article: Dict, post_fields: Dict, tag_names=()) -> tuple:
+    """
+    Create the WordPress post for a rewritten article.
+    
+    Tags suggested by the LLM are resolved (and created if missing) here,
+    so for drafts that work also happens on the publisher thread. If the
+    article has an image it is uploaded first and the post is created
+    already published with it as the featured image; the social share is
+    then queued on _SOCIAL_POOL. Without a usable image the post is
+    created with the status in post_fields.
+    
+    Args:
+        auth (dict): WordPress authentication
+        article (dict): Source article (image, domain, description)
+        post_fields (dict): Keyword arguments for create_wp_post
+        tag_names (list): Tag names from the LLM output to add to the post
+    
+    Returns:
+        tuple: (post ID or None, True if the post was published with an image)
+    """
+    new_title = post_fields["title"]
+    
+    # Create new tags from LLM response if they don't exist
+    if tag_names:
+        tags = list(post_fields.get("tags") or [])
+        for tag_id in create_wp_tags(auth, [t for t in tag_names if t]):
+            if tag_id and tag_id not in tags:
+                tags.append(tag_id)
+        post_fields = {**post_fields, "tags": tags}
+    
+    # Upload the featured image first so the post can be created with it
+    # attached and published in a single request
+    img_url = article.get('image', '')
+    media_id = None
+    if img_url:
+        media_id = upload_media_to_wp(
+            auth,
+            img_url,
+            title=new_title,
+            alt_text=f"{new_title} - {article.get('domain', 'Creator Newsdesk')}",
+            caption=new_title,
+            description=f"Image for article: {new_title} - {article.get('description', '')[:200]}"
+        )
+    
+    if not media_id:
+        # No usable image - create the post as configured (usually a draft)
+        return create_wp_post(auth, **post_fields), False
+    
+    post_id = create_wp_post(auth, **{**post_fields, "status": "publish", "featured_media": media_id})
+    if not post_id:
+        return None, False
+    
+    logger.info("  Added featured image with SEO metadata")
+    logger.info("  Published!")
+    
+    # Post to social media in the background
+    if HAS_SOCIAL:
+        _SOCIAL_JOBS.append(_SOCIAL_POOL.submit(share_to_socials, new_title, post_id, img_url))
+    return post_id, True
+
+
+def get_category_id(auth: Dict, name: str) -> Optional[int]:
+    """
+    Look up a WordPress category ID by name.
+    
+    Served from the cached name index; the category collection is only
+    (re)fetched on a miss, and then revalidated rather than re-downloaded
+    when it hasn't changed.
+    
+    Args:
+        auth (dict): WordPress authentication
+        name (str): Category name (case-insensitive)
+    
+    Returns:
+        int: Category ID, or None if no such category exists
+    """
+    cat_id = wp_term_id("categories", name)
+    if cat_id is None:
+        get_wp_categories(auth)
+        cat_id = wp_term_id("categories", name)
+    return cat_id
+
+
 def create_wp_category(auth: Dict, name: str, description: str = "") -> Optional[int]:
     """
-    Create a new WordPress category.
+    Create a new WordPress category, or return the ID of an existing one.
+    
+    Categories already in the cached name index are returned without a
+    request; a created category is added to the index.
     
     Args:
         auth (dict): WordPress authentication
@@ -823,60 +2037,109 @@ def create_wp_category(auth: Dict, name: str, description: str = "") -> Optional
     Returns:
         int: Created category ID or None
     """
-    api_base = auth.get("api_base", WP_API_BASE)
-    user = auth.get("user", WP_USER)
-    password = auth.get("password", WP_APP_PASSWORD)
+    cat_id = get_category_id(auth, name)
+    if cat_id is not None:
+        return cat_id
+    
+    api_base, http_auth = _resolve_auth(auth)
     
     try:
-        resp = requests.post(
+        resp = _SESSION.post(
             f"{api_base}/wp/v2/categories",
-            auth=(user, password),
-            json={"name": name, "description": description}
+            auth=http_auth,
+            json={"name": name, "description": description},
+            timeout=WP_TIMEOUT
         )
         
         if resp.status_code in (200, 201):
-            return resp.json()["id"]
+            cat_id = response_json(resp)["id"]
+        elif resp.status_code == 400:
+            # Created since the cache was filled; WordPress names it in the error
+            cat_id = (response_json(resp).get("data") or {}).get("term_id")
+        
+        if cat_id is not None:
+            _remember_wp_term("categories", cat_id, name)
+            return cat_id
     
     except Exception as e:
-        print(f"Category creation error: {e}")
+        logger.error(f"Category creation error: {e}")
     
     return None
 
 
 def create_wp_tag(auth: Dict, name: str) -> Optional[int]:
-    """Create a new WordPress tag."""
-    api_base = auth.get("api_base", WP_API_BASE)
-    user = auth.get("user", WP_USER)
-    password = auth.get("password", WP_APP_PASSWORD)
+    """
+    Create a new WordPress tag, or return the ID of an existing one.
+    
+    Tags already in the cached name index are returned without a request.
+    Otherwise the tag is created; if WordPress reports it exists, the ID
+    from the term_exists error is used, falling back to a search.
+    """
+    tag_id = wp_term_id("tags", name)
+    if tag_id is not None:
+        return tag_id
+    
+    api_base, http_auth = _resolve_auth(auth)
     
     try:
-        resp = requests.post(
+        resp = _SESSION.post(
             f"{api_base}/wp/v2/tags",
-            auth=(user, password),
-            json={"name": name}
+            auth=http_auth,
+            json={"name": name},
+            timeout=WP_TIMEOUT
         )
         
         if resp.status_code in (200, 201):
-            return resp.json()["id"]
+            tag_id = response_json(resp)["id"]
         elif resp.status_code == 400:
-            # Tag might already exist, try to find it
-            search_resp = requests.get(
-                f"{api_base}/wp/v2/tags",
-                auth=(user, password),
-                params={"search": name}
-            )
-            if search_resp.status_code == 200:
-                tags = search_resp.json()
-                for tag in tags:
-                    if tag.get("name", "").lower() == name.lower():
-                        return tag["id"]
+            # Tag might already exist; WordPress names it in the error
+            tag_id = (response_json(resp).get("data") or {}).get("term_id")
+            if tag_id is None:
+                search_resp = _SESSION.get(
+                    f"{api_base}/wp/v2/tags",
+                    auth=http_auth,
+                    params={"search": name},
+                    timeout=WP_TIMEOUT
+                )
+                if search_resp.status_code == 200:
+                    tags = response_json(search_resp)
+                    for tag in tags:
+                        if _term_name_key(tag.get("name", "")) == _term_name_key(name):
+                            tag_id = tag["id"]
+                            break
+        
+        if tag_id is not None:
+            _remember_wp_term("tags", tag_id, name)
+            return tag_id
     
     except Exception as e:
-        print(f"Tag creation error: {e}")
+        logger.error(f"Tag creation error: {e}")
     
     return None
 
 
+def create_wp_tags(auth: Dict, names: List[str]) -> List[Optional[int]]:
+    """
+    Create (or look up) several WordPress tags concurrently.
+    
+    The tag list is loaded (or revalidated) once first so existing tags
+    resolve from the name index; the remaining creates are independent
+    requests, issued together on the WP pool so they complete in roughly
+    one round-trip instead of one per tag.
+    
+    Args:
+        auth (dict): WordPress authentication
+        names (list): Tag names
+    
+    Returns:
+        list: Tag ID (or None on failure) for each name, in order
+    """
+    if not names:
+        return []
+    get_wp_tags(auth)
+    return list(_WP_POOL.map(lambda name: create_wp_tag(auth, name), names))
+
+
 def main():
     """
     Main pipeline execution function.
@@ -894,138 +2157,289 @@ def main():
     """
 
 
+# CATEGORY_MAP brands as one case-insensitive, whole-word alternation.
+# When several brands appear, the one listed first in CATEGORY_MAP wins,
+# as it did with the old dict scan.
+_CATEGORY_RANK = {brand.lower(): rank for rank, brand in enumerate(CATEGORY_MAP)}
+_CATEGORY_BY_LOWER = {brand.lower(): cat_id for brand, cat_id in CATEGORY_MAP.items()}
+_CATEGORY_RE = re.compile(
+    r"\b(" + "|".join(map(re.escape, CATEGORY_MAP)) + r")\b", re.IGNORECASE
+)
+
+
 def extract_category_from_query(query: str) -> Optional[int]:
     """Extract WordPress category ID from search query."""
-    query_upper = query.upper()
-    for brand, cat_id in CATEGORY_MAP.items():
-        if brand.upper() in query_upper:
-            return cat_id
-    return None
+    found = {m.lower() for m in _CATEGORY_RE.findall(query)}
+    if not found:
+        return None
+    return _CATEGORY_BY_LOWER[min(found, key=_CATEGORY_RANK.__getitem__)]
+
+
+# Brave ages look like "3 days ago"; units are checked in this order
+_AGE_NUM_RE = re.compile(r"(\d+)")
+_AGE_UNIT_DAYS = (("day", 1), ("week", 7), ("month", 30))
 
 
+@functools.lru_cache(maxsize=1024)
 def get_article_age_days(age_str: str) -> Optional[int]:
-    """Parse article age string and return days, or None if unknown."""
+    """
+    Parse article age string and return days, or None if unknown.
+    
+    Brave's relative ages ("3 days ago", "1 week ago") repeat across
+    results, so parses are memoized.
+    """
     if not age_str:
         return None
     age_lower = age_str.lower()
     if "hour" in age_lower:
         return 0
-    if "day" in age_lower:
-        import re
-        match = re.search(r'(\d+)', age_str)
-        return int(match.group(1)) if match else None
-    if "week" in age_lower:
-        import re
-        match = re.search(r'(\d+)', age_str)
-        return int(match.group(1)) * 7 if match else None
-    if "month" in age_lower:
-        import re
-        match = re.search(r'(\d+)', age_str)
-        return int(match.group(1)) * 30 if match else None
+    for unit, days in _AGE_UNIT_DAYS:
+        if unit in age_lower:
+            match = _AGE_NUM_RE.search(age_str)
+            return int(match.group(1)) * days if match else None
     return None
 
 
-def parse_brave_date(published_time: str) -> Optional[str]:
-    """Convert Brave's published_time to WP date format."""
+@functools.lru_cache(maxsize=1024)
+def parse_published_time(published_time: str) -> Optional[datetime]:
+    """
+    Parse an ISO published_time (Brave or RSS), or None if unparseable.
+    
+    Cached: an article's timestamp is parsed for its age check and again
+    for the WP post date, and the same stories recur across queries.
+    """
     if not published_time:
         return None
     try:
-        # Brave returns ISO format like "2026-02-20T15:55:43"
-        # Convert to WP format "2026-02-20T15:55:00"
-        from datetime import datetime
-        dt = datetime.fromisoformat(published_time.replace('Z', '+00:00'))
-        return dt.strftime("%Y-%m-%dT%H:%M:%S")
-    except:
+        return datetime.fromisoformat(published_time.replace('Z', '+00:00'))
+    except (TypeError, ValueError, AttributeError):
         return None
 
 
+def parse_brave_date(published_time: str) -> Optional[str]:
+    """Convert Brave's published_time to WP date format."""
+    # Brave returns ISO format like "2026-02-20T15:55:43"
+    # Convert to WP format "2026-02-20T15:55:00"
+    dt_obj = parse_published_time(published_time)
+    return dt_obj.strftime("%Y-%m-%dT%H:%M:%S") if dt_obj else None
+
+
+# Map brand names to WP tag IDs (brands without a tag are left out)
+_BRAND_TO_TAG_ID = {
+    "dji": 3, "gopro": 28, "insta360": 27, "skydio": 29, "autel": 30,
+    "sony": 31, "canon": 32, "nikon": 33, "fujifilm": 34, "panasonic": 35,
+    "rode": 36, "shure": 37, "sennheiser": 38, "audio-technica": 39,
+    "elgato": 44, "logitech": 50, "razer": 48,
+}
+
+# Single-word keywords and brands are looked up per query token;
+# the few multi-word TAG_MAP keys get their own alternation
+_TAG_BY_TOKEN = {k: v for k, v in TAG_MAP.items() if " " not in k}
+_TAG_BY_TOKEN.update(_BRAND_TO_TAG_ID)
+_TAG_PHRASES = {k: v for k, v in TAG_MAP.items() if " " in k}
+_TAG_PHRASE_RE = re.compile(
+    r"\b(" + "|".join(map(re.escape, _TAG_PHRASES)) + r")\b", re.IGNORECASE
+)
+_QUERY_TOKEN_RE = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+
+# Extra tags implied by a query's category
+CATEGORY_EXTRA_TAGS = {
+    # Drones -> drone + dji tag
+    4: (4, 3), 13: (4, 3), 17: (4, 3), 16: (4, 3), 14: (4, 3), 15: (4, 3),
+    # Camera
+    18: (8,), 19: (8,), 20: (8,), 40: (8,), 41: (8,),
+    # Audio
+    21: (6,), 22: (6,), 42: (6,), 43: (6,), 6: (6,),
+    # Streaming
+    23: (9,), 49: (9,), 47: (9,),
+    # Lighting
+    7: (7,),
+}
+
+
 def get_tags_from_query(query: str) -> List[int]:
     """Extract tag IDs from search query and category context."""
-    tags = []
     query_lower = query.lower()
     
-    # Map brand names to WP tag IDs
-    brand_to_tag_id = {
-        "dji": 3, "gopro": 28, "insta360": 27, "skydio": 29, "autel": 30,
-        "sony": 31, "canon": 32, "nikon": 33, "fujifilm": 34, "panasonic": 35,
-        "rode": 36, "shure": 37, "sennheiser": 38, "audio-technica": 39,
-        "elgato": 44, "logitech": 50, "razer": 48,
-        "sigma": None, "tamron": None, "tokina": None,
-    }
-    
-    # Check query for brand keywords
-    for keyword, tag_id in TAG_MAP.items():
-        if keyword in query_lower:
-            if tag_id not in tags:
-                tags.append(tag_id)
-    
-    # Add brand tags
-    for brand, tag_id in brand_to_tag_id.items():
-        if brand in query_lower and tag_id:
-            if tag_id not in tags:
-                tags.append(tag_id)
+    # Whole words, plus the parts of hyphenated ones so "audio-technica"
+    # also counts as "audio"; a word ending in "360" ("insta360") also
+    # counts as "360", as it did under the old substring scan
+    tokens = set()
+    for token in _QUERY_TOKEN_RE.findall(query_lower):
+        tokens.add(token)
+        if "-" in token:
+            tokens.update(token.split("-"))
+        if token.endswith("360"):
+            tokens.add("360")
+    
+    # Check query for keyword and brand tags
+    tags = {_TAG_BY_TOKEN[token] for token in tokens if token in _TAG_BY_TOKEN}
+    tags.update(_TAG_PHRASES[m.lower()] for m in _TAG_PHRASE_RE.findall(query))
     
     # Also add tags based on category
-    category = extract_category_from_query(query)
-    if category:
-        if category == 4 or category in [13, 17, 16, 14, 15]:  # Drones
-            tags.extend([4, 3])  # drone + dji tag
-        elif category in [18, 19, 20, 40, 41]:  # Camera
-            tags.extend([8])  
-        elif category in [21, 22, 42, 43, 6]:  # Audio
-            tags.extend([6])
-        elif category in [23, 49, 47]:  # Streaming
-            tags.extend([9])
-        elif category == 7:  # Lighting
-            tags.extend([7])
-    
-    return list(set(tags))  # Remove duplicates
+    tags.update(CATEGORY_EXTRA_TAGS.get(extract_category_from_query(query), ()))
+    
+    return list(tags)
+
+
+# BRAND_TONES keys (already lowercase) as one alternation, matched
+# anywhere like the old substring scan so "gimbals" still hits "gimbal";
+# earlier keys keep priority over later ones
+_BRAND_TONE_RANK = {brand: rank for rank, brand in enumerate(BRAND_TONES) if brand != "default"}
+_BRAND_TONE_RE = re.compile(
+    "|".join(map(re.escape, sorted(_BRAND_TONE_RANK, key=len, reverse=True))), re.IGNORECASE
+)
+
+
+def _pick_tone(tone) -> str:
+    """Return tone, or a random choice if it is a list of variants."""
+    if isinstance(tone, list):
+        return random.choice(tone)
+    return tone
+
+
+def _find_brand_tone(text: str) -> Optional[str]:
+    """Highest-priority BRAND_TONES key mentioned in text, if any."""
+    found = {m.lower() for m in _BRAND_TONE_RE.findall(text)}
+    if not found:
+        return None
+    return min(found, key=_BRAND_TONE_RANK.__getitem__)
 
 
 def get_brand_tone(query: str, article_content: str = "") -> str:
     """Get the writing tone based on the brand in the query or article content."""
-    import random
+    # Check query first, then article title/content if provided
+    brand = _find_brand_tone(query)
+    if brand is None and article_content:
+        brand = _find_brand_tone(article_content)
+    if brand is not None:
+        return _pick_tone(BRAND_TONES[brand])
     
-    # Check query first
-    query_lower = query.lower()
-    for brand, tone in BRAND_TONES.items():
-        if brand in query_lower:
-            # Handle both list and string
-            if isinstance(tone, list):
-                return random.choice(tone)
-            return tone
-    
-    # Also check article title/content if provided
-    if article_content:
-        content_lower = article_content.lower()
-        for brand, tone in BRAND_TONES.items():
-            if brand in content_lower:
-                if isinstance(tone, list):
-                    return random.choice(tone)
-                return tone
-    
-    default_tone = BRAND_TONES.get("default", "Be informative and professional. Write for content creators.")
-    if isinstance(default_tone, list):
-        return random.choice(default_tone)
-    return default_tone
+    return _pick_tone(BRAND_TONES.get("default", "Be informative and professional. Write for content creators."))
+
+
+# All TITLE_STRIP_TOKENS as one alternation; longest first so " | B&H Photo"
+# wins over its prefix " | B&H"
+_TITLE_STRIP_RE = re.compile("|".join(
+    re.escape(token) for token in sorted(TITLE_STRIP_TOKENS, key=len, reverse=True)
+))
+
+
+# Deletes every ASCII character that isn't a letter or digit; used with
+# an ASCII encode (which drops the rest) to turn a tag into a hashtag
+_HASHTAG_DELETE = str.maketrans("", "", "".join(
+    chr(c) for c in range(128) if not chr(c).isalnum()
+))
+
+
+def hashtag_text(tag: str) -> str:
+    """Lowercase ASCII letters and digits of tag, e.g. "Sony a7 IV" -> "sonya7iv"."""
+    return tag.encode("ascii", "ignore").decode("ascii").translate(_HASHTAG_DELETE).lower()
 
 
 def strip_title_site_names(title: str) -> str:
-    """Remove site names like '| TechCrunch' from titles."""
-    result = title
-    for token in TITLE_STRIP_TOKENS:
-        result = result.replace(token, "")
-    return result.strip()
+    """
+    Remove site names like '| TechCrunch' from titles.
+    
+    Every occurrence is removed in one pass, so a second call is a no-op.
+    """
+    return _TITLE_STRIP_RE.sub("", title).strip()
+
+
+# Query parameters that only track the referrer, dropped by canonical_url
+_TRACKING_PARAM_PREFIXES = ("utm_", "mc_")
+_TRACKING_PARAMS = frozenset({"fbclid", "gclid", "ref", "cmpid"})
+
+
+def _is_tracking_param(pair: str) -> bool:
+    name = pair.partition("=")[0].lower()
+    return name in _TRACKING_PARAMS or name.startswith(_TRACKING_PARAM_PREFIXES)
+
+
+@functools.lru_cache(maxsize=4096)
+def canonical_url(url: str) -> str:
+    """
+    Normalize an article URL for duplicate detection.
+    
+    Lowercases the scheme and host, drops "www.", the fragment, a trailing
+    slash and tracking parameters, so the same article reached through
+    different links compares equal.
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = "&".join(
+        pair for pair in parts.query.split("&")
+        if pair and not _is_tracking_param(pair)
+    )
+    path = parts.path.rstrip("/") or "/"
+    return f"{host}{path}?{query}" if query else f"{host}{path}"
+
+
+def _query_candidates(rss_articles: List[Dict], brave_articles: List[Dict]) -> List[Dict]:
+    """
+    Combine RSS articles with the usable Brave results for one query.
+    
+    RSS articles come first (they have real dates); Brave results are
+    kept only if they are from today and have an image.
+    """
+    articles = list(rss_articles)
+    for ba in brave_articles:
+        age = get_article_age_days(ba.get("age", ""))
+        if age is not None and age <= 1 and ba.get("image"):
+            articles.append(ba)
+    return articles
+
+
+def iter_query_articles(queries: List[str], brave_futures: List[Future]):
+    """
+    Yield (query, candidate articles) in query order from a fetch thread.
+    
+    The thread fetches the RSS feeds once (they don't depend on the query)
+    and then builds each query's candidates as its Brave search completes,
+    handing them over through a queue of FETCH_QUEUE_DEPTH entries so it
+    never runs far ahead of processing.
+    
+    Args:
+        queries (list): Search queries
+        brave_futures (list): Brave search futures from prefetch_brave
+    
+    Yields:
+        tuple: (query, list of article dicts)
+    """
+    handoff = queue.Queue(maxsize=FETCH_QUEUE_DEPTH)
+    
+    def produce():
+        try:
+            rss_articles = fetch_rss_feeds(count=5)
+            for query, brave_future in zip(queries, brave_futures):
+                handoff.put((query, _query_candidates(rss_articles, brave_future.result())))
+        except Exception as e:
+            logger.error(f"Fetch stage error: {e}")
+        finally:
+            handoff.put(None)
+    
+    # Daemon, so an aborted run isn't held open by a thread blocked on put()
+    threading.Thread(target=produce, name="cnd-fetch", daemon=True).start()
+    while True:
+        item = handoff.get()
+        if item is None:
+            return
+        yield item
 
 
 def main():
     
+    setup_logging()
+    
     # Load configuration
     config = load_config()
     
     # Load caches
     load_wp_cache()
     processed_urls = load_processed()
+    processed_log = open_processed_log()
     
     stats = {
         "fetched": 0,
@@ -1038,7 +2452,7 @@ def main():
     # Get first configured site
     sites = config.get("sites", [])
     if not sites:
-        print("No sites configured in config.json")
+        logger.warning("No sites configured in config.json")
         return stats
     
     site = sites[0]
@@ -1050,68 +2464,77 @@ def main():
         "user": author.get("user", WP_USER),
         "password": author.get("password", WP_APP_PASSWORD)
     }
-    search_config = site.get("search", {})
-    structure = search_config.get("structure", {})
+    search_config = SearchConfig.from_dict(site.get("search", {}))
     
     # Build search terms from configured brands
-    search_queries = []
-    for category, brands in structure.items():
-        if isinstance(brands, dict):
-            for brand, terms in brands.items():
-                if isinstance(terms, list):
-                    for term in terms:
-                        search_queries.append(f"{brand} {term}")
-                else:
-                    search_queries.append(f"{brand} {brands}")
-        else:
-            search_queries.append(category)
+    search_queries = search_config.queries()
     
-    print(f"Built {len(search_queries)} search queries")
+    logger.info(f"Built {len(search_queries)} search queries")
     
     # Get Brave API keys
     brave_keys = site.get("brave_keys", [])
     if not brave_keys:
         brave_keys = [BRAVE_API_KEY]
     
-    # Process each search query
-    for i, query in enumerate(search_queries):
-        # Rotate through API keys to avoid rate limits
-        api_key = brave_keys[i % len(brave_keys)]
-        
-        print(f"Searching: {query}")
-        
-        # Fetch from RSS feeds first (they have real dates)
-        rss_articles = fetch_rss_feeds(count=5)
-        articles = rss_articles
-        
-        # Also try Brave - only get recent ones with images
-        brave_articles = search_brave(query, api_key, count=50)
-        # Filter Brave results: only today, only with images
-        for ba in brave_articles:
-            age = get_article_age_days(ba.get("age", ""))
-            if age is not None and age <= 1 and ba.get("image"):
-                articles.append(ba)
-        
-        stats["fetched"] += len(articles)
-        
-        # Limit articles if specified (for cron - process 1 at a time)
-        max_articles = os.environ.get("MAX_ARTICLES")
-        if max_articles:
-            articles = articles[:int(max_articles)]
-        
+    # Drafts (articles without images) are created on a background
+    # thread while the next article is rewritten; results are collected
+    # here, on the main thread, in submission order
+    pending_drafts = deque()
+    
+    def finish_draft(job):
+        future, draft_url, title = job
+        post_id, _ = future.result()
+        if post_id:
+            mark_processed(processed_urls, processed_log, draft_url)
+            stats["created"] += 1
+            logger.info(f"Drafted post {post_id}: {title[:50]}...")
+        else:
+            stats["errors"] += 1
+        stats["processed"] += 1
+    
+    # (domain, title prefix) pairs seen this run - Brave often returns the
+    # same story under several URLs, don't spend an LLM call on each.
+    # seen_urls catches the same article returned for several queries
+    # (or with tracking parameters) before any other check runs.
+    seen_stories = set()
+    seen_urls = set()
+    
+    def rewrite_candidates(query, articles):
+        """
+        Apply the skip rules to a query's articles and build the LLM
+        prompt for each one worth rewriting.
+        """
         for article in articles:
             url = article.get("url", "")
             
-            # Skip already processed URLs
-            if url in processed_urls:
+            # Skip articles already taken by an earlier query this run
+            url_key = canonical_url(url)
+            if url_key in seen_urls:
+                stats["skipped"] += 1
+                continue
+            
+            # Skip already processed URLs (by canonical key as well, as
+            # older entries were recorded by raw URL only)
+            if url in processed_urls or url_key in processed_urls:
                 stats["skipped"] += 1
                 continue
             
-            # Mark as processed
-            processed_urls.add(url)
+            # Skip articles with too little text to rewrite, before they
+            # claim the story key or cost an LLM call
+            if len((article.get("description") or "").split()) < MIN_DESC_WORDS:
+                stats["skipped"] += 1
+                continue
             
-            # Extract category from search query
-            article_category = extract_category_from_query(query)
+            # Skip near-duplicates of a story already handled this run
+            story_key = (
+                article.get("domain", "").lower(),
+                " ".join(article.get("title", "").lower().split())[:40]
+            )
+            if story_key in seen_stories:
+                stats["skipped"] += 1
+                continue
+            seen_stories.add(story_key)
+            seen_urls.add(url_key)
             
             # Determine if article has valid date and image
             article_age_days = get_article_age_days(article.get("age", ""))
@@ -1119,22 +2542,17 @@ def main():
             
             # For RSS articles, use the actual date for age calculation
             if article.get("source") == "rss" and article.get("published_time"):
-                try:
-                    from datetime import datetime
-                    dt_obj = datetime.fromisoformat(article["published_time"].replace('Z', '+00:00'))
+                dt_obj = parse_published_time(article["published_time"])
+                if dt_obj:
                     age = datetime.now() - dt_obj.replace(tzinfo=None)
                     article_age_days = age.days
-                except:
-                    pass
             
-            # Skip articles older than 7 days
+            # Skip articles older than 7 days (they'll never qualify again)
             if article_age_days is not None and article_age_days > 7:
+                mark_processed(processed_urls, processed_log, url)
                 stats["skipped"] += 1
                 continue
             
-            # Always create as draft first - will publish only if has image
-            post_status = "draft"
-            
             # Get tags for this article
             article_tags = get_tags_from_query(query)
             
@@ -1145,19 +2563,78 @@ def main():
             clean_title = strip_title_site_names(article.get('title', ''))
             
             # Rewrite article with LLM - use description for actual content
-            prompt = f"""You are a tech journalist. {brand_tone}
+            # The fixed instructions are REWRITE_SYSTEM_PROMPT; only the
+            # per-article part goes in the user message
+            prompt = f"""{brand_tone}
 
 Summary: {article.get('description', '')[:300]}
 Source: {article.get('domain', '')}
-Date: {article.get('age', '')}
-
-Generate output in this EXACT format (4 lines):
-HEADLINE: [Your new catchy SEO-friendly headline, max 60 chars]
-META: [Your SEO meta description, max 155 chars, include keywords]
-TAGS: [comma-separated list of 3-5 relevant tags/keywords for this article, like: dji, drone, camera, review, news]
-ARTICLE: [Your 2-3 paragraph article content]"""
-
-            generated_content = generate_with_llm(prompt)
+Date: {article.get('age', '')}"""
+            
+            yield article, url, story_key, has_image, clean_title, article_tags, prompt
+    
+    # Start all Brave searches up front; keys are still rotated per query
+    # and each key is rate limited, but round-trips overlap with processing
+    brave_futures = prefetch_brave(search_queries, brave_keys, count=50)
+    
+    # Process each search query; candidates are assembled by the fetch
+    # stage in the background, so the next query's fetching overlaps this
+    # query's LLM rewrites
+    for query, articles in iter_query_articles(search_queries, brave_futures):
+        logger.info(f"Searching: {query}")
+        
+        stats["fetched"] += len(articles)
+        
+        # Limit articles if specified (for cron - process 1 at a time)
+        max_articles = os.environ.get("MAX_ARTICLES")
+        if max_articles:
+            articles = articles[:int(max_articles)]
+        
+        # Extract category from search query
+        article_category = extract_category_from_query(query)
+        
+        # Embed the query's unprocessed articles for the semantic cache in
+        # one batched model call rather than one call per rewrite
+        semantic_vectors = {}
+        index = semantic_index(LOCAL_LLM_MODEL)
+        if index is not None:
+            pending = [a for a in articles if a.get("url", "") not in processed_urls]
+            if pending:
+                vectors = index.embed([article_semantic_text(a) for a in pending])
+                semantic_vectors = {a.get("url", ""): v for a, v in zip(pending, vectors)}
+        
+        # Rewrites run on the LLM pool up to LLM_PARALLEL articles ahead
+        # (the server must allow that many parallel slots); results are
+        # still handled one at a time, in article order
+        candidates = rewrite_candidates(query, articles)
+        rewrites = deque()
+        while True:
+            while len(rewrites) < LLM_PARALLEL:
+                candidate = next(candidates, None)
+                if candidate is None:
+                    break
+                article, prompt = candidate[0], candidate[-1]
+                # Reuse an earlier rewrite of the same story if we have one
+                rewrites.append((candidate, _LLM_POOL.submit(
+                    generate_with_llm,
+                    prompt,
+                    cache_key=llm_cache_key(article.get('title', ''), article.get('description', '')),
+                    semantic_text=article_semantic_text(article),
+                    semantic_vector=semantic_vectors.get(article.get("url", "")),
+                    system=REWRITE_SYSTEM_PROMPT
+                )))
+            if not rewrites:
+                break
+            
+            # Collect any drafts the publisher has finished
+            while pending_drafts and pending_drafts[0][0].done():
+                finish_draft(pending_drafts.popleft())
+            
+            (article, url, story_key, has_image, clean_title, article_tags, prompt), llm_future = rewrites.popleft()
+            generated_content = llm_future.result()
+            
+            # Always create as draft first - will publish only if has image
+            post_status = "draft"
             
             if not generated_content:
                 stats["errors"] += 1
@@ -1169,56 +2646,43 @@ ARTICLE: [Your 2-3 paragraph article content]"""
             tag_names = []
             new_content = generated_content.strip()
             
-            lines = generated_content.split('\n')
-            for line in lines:
-                line = line.strip()
-                if line.startswith("HEADLINE:"):
-                    seo_title = line.replace("HEADLINE:", "").strip()
-                elif line.startswith("META:"):
-                    seo_description = line.replace("META:", "").strip()
-                elif line.startswith("TAGS:"):
-                    tags_str = line.replace("TAGS:", "").strip()
-                    tag_names = [t.strip().lower() for t in tags_str.split(',') if t.strip()]
-                elif line.startswith("ARTICLE:"):
-                    new_content = line.replace("ARTICLE:", "").strip()
+            # One scan over the output; a repeated field keeps its last value
+            fields = {m.group(1): m.group(2).strip()
+                      for m in _LLM_LINE_RE.finditer(generated_content)}
+            seo_title = fields.get("HEADLINE", seo_title)
+            seo_description = fields.get("META", seo_description)
+            if "TAGS" in fields:
+                tag_names = [t for t in (part.strip().lower() for part in fields["TAGS"].split(',')) if t]
+            new_content = fields.get("ARTICLE", new_content)
             
             # Use extracted title
             new_title = seo_title
             
             # Clean up title
             new_title = strip_title_site_names(new_title)
-            new_title = strip_title_site_names(new_title)
             
             # Count words
             word_count = len(new_content.split())
             
             # Skip if content is too short for SEO
             if word_count < 400:
-                print(f"  Skipped: Content too short ({word_count} words)")
+                logger.info(f"  Skipped: Content too short ({word_count} words)")
                 stats["skipped"] += 1
                 continue
             
-            # Create new tags from LLM response if they don't exist
-            for tag_name in tag_names:
-                if tag_name:
-                    tag_id = create_wp_tag(auth, tag_name)
-                    if tag_id and tag_id not in article_tags:
-                        article_tags.append(tag_id)
-            
             # Create WordPress post with category, tags, and appropriate status
             # Build social message with 3 hashtags from tags
             social_hashtags = []
             for tag in tag_names[:3]:  # Use first 3 tags as hashtags
                 if tag and len(tag) > 2:  # Skip short tags
                     # Clean tag for hashtag (no spaces, lowercase)
-                    hashtag = re.sub(r'[^a-zA-Z0-9]', '', tag).lower()
+                    hashtag = hashtag_text(tag)
                     if hashtag and hashtag not in social_hashtags:
                         social_hashtags.append(f"#{hashtag}")
             
             social_message = f"{new_title[:200]} {' '.join(social_hashtags)}" if social_hashtags else None
             
-            post_id = create_wp_post(
-                auth,
+            post_fields = dict(
                 title=new_title,
                 content=new_content,
                 categories=[article_category] if article_category else [],
@@ -1231,76 +2695,58 @@ ARTICLE: [Your 2-3 paragraph article content]"""
                 social_message=social_message
             )
             
-            status_label = "Published" if has_image else "Drafted"
+            if not has_image:
+                # Drafts never end the query early, so hand them to the
+                # publisher thread and start the next LLM rewrite now
+                if len(pending_drafts) >= PUBLISH_QUEUE_DEPTH:
+                    finish_draft(pending_drafts.popleft())
+                pending_drafts.append((
+                    _PUBLISH_POOL.submit(publish_article, auth, article, post_fields, tag_names),
+                    url,
+                    article.get('title', '')
+                ))
+                continue
+            
+            # Articles with an image are published inline: the first one
+            # that succeeds ends this query
+            post_id, published = publish_article(auth, article, post_fields, tag_names)
             if post_id:
-                # Try to set featured image with full SEO
-                img_url = article.get('image', '')
-                if img_url:
-                    # Build SEO metadata for image
-                    alt_text = f"{new_title} - {article.get('domain', 'Creator Newsdesk')}"
-                    caption = new_title
-                    description = f"Image for article: {new_title} - {article.get('description', '')[:200]}"
-                    
-                    media_id = upload_media_to_wp(
-                        auth, 
-                        img_url, 
-                        title=new_title,
-                        alt_text=alt_text,
-                        caption=caption,
-                        description=description
-                    )
-                    if media_id:
-                        set_featured_image(auth, post_id, media_id)
-                        print(f"  Added featured image with SEO metadata")
-                        
-                        # Update post to publish status
-                        api_base = auth.get("api_base", WP_API_BASE)
-                        user = auth.get("user", WP_USER)
-                        password = auth.get("password", WP_APP_PASSWORD)
-                        requests.post(
-                            f"{api_base}/wp/v2/posts/{post_id}",
-                            auth=(user, password),
-                            json={"status": "publish"}
-                        )
-                        print(f"  Published!")
-                        
-                        # Post to social media
-                        if HAS_SOCIAL:
-                            try:
-                                post_url = f"https://www.creatornewsdesk.com/?p={post_id}"
-                                social_results = social_poster.post_to_all_socials(
-                                    new_title,
-                                    post_url,
-                                    img_url
-                                )
-                                print(f"  Social: {social_results}")
-                            except Exception as e:
-                                print(f"  Social post error: {e}")
-                        
-                        # Stop after publishing one with image
-                        break
-                        
+                # Only a created post marks the URL done - LLM or WP
+                # failures leave it eligible for the next run
+                mark_processed(processed_urls, processed_log, url)
                 stats["created"] += 1
-                print(f"{status_label} post {post_id}: {article.get('title', '')[:50]}...")
+                status_label = "Published" if published else "Drafted"
+                logger.info(f"{status_label} post {post_id}: {article.get('title', '')[:50]}...")
                 
-                # If we published this one (had image), stop
-                if has_image:
-                    break
-            else:
-                stats["errors"] += 1
+                # Stop after publishing one with image; rewrites started
+                # ahead are dropped and their stories stay eligible for
+                # later queries (finished ones are in the LLM cache)
+                for (_, pending_url, pending_story, *_), pending_future in rewrites:
+                    pending_future.cancel()
+                    seen_stories.discard(pending_story)
+                    seen_urls.discard(canonical_url(pending_url))
+                break
             
+            stats["errors"] += 1
             stats["processed"] += 1
     
+    # Wait for drafts still being created and shares still being sent
+    while pending_drafts:
+        finish_draft(pending_drafts.popleft())
+    wait_for_social_posts()
+    
     # Save caches
+    processed_log.close()
     save_wp_cache()
     save_processed(processed_urls)
+    save_semantic_indexes()
     
-    print(f"\nPipeline complete:")
-    print(f"  Fetched: {stats['fetched']}")
-    print(f"  Processed: {stats['processed']}")
-    print(f"  Created: {stats['created']}")
-    print(f"  Skipped: {stats['skipped']}")
-    print(f"  Errors: {stats['errors']}")
+    logger.info("Pipeline complete:")
+    logger.info(f"  Fetched: {stats['fetched']}")
+    logger.info(f"  Processed: {stats['processed']}")
+    logger.info(f"  Created: {stats['created']}")
+    logger.info(f"  Skipped: {stats['skipped']}")
+    logger.info(f"  Errors: {stats['errors']}")
     
     # Generate policy reminder post
     maybe_generate_policy_post(auth)
@@ -1310,11 +2756,9 @@ ARTICLE: [Your 2-3 paragraph article content]"""
 
 def generate_policy_reminder_post(auth: Dict, platform: str = None) -> Optional[int]:
     """Generate a policy reminder post using the knowledgebase."""
-    import random
-    
     # Pick a random platform if not specified
     if not platform:
-        platform = random.choice(list(PLATFORM_POLICIES.keys()))
+        platform = random.choice(_PLATFORM_KEYS)
     
     policy_data = PLATFORM_POLICIES.get(platform, PLATFORM_POLICIES["general"])
     policies = policy_data.get("policies", [])
@@ -1342,12 +2786,8 @@ def generate_policy_reminder_post(auth: Dict, platform: str = None) -> Optional[
     meta_desc = f"Daily creator tip: {platform_name} policies you need to know. {POLICY_REMINDER_HASHTAG}"
     
     # Get tag IDs - create if don't exist
-    tag_ids = []
     tag_names_to_create = ["creators", "creatorslistenup", platform_name.lower()]
-    for tag_name in tag_names_to_create:
-        tag_id = create_wp_tag(auth, tag_name)
-        if tag_id:
-            tag_ids.append(tag_id)
+    tag_ids = [tag_id for tag_id in create_wp_tags(auth, tag_names_to_create) if tag_id]
     
     # Build social message with hashtags for policy posts
     social_hashtags = [f"#{tag}" for tag in ["CreatorsListenUp", platform_name.lower()]]
@@ -1375,15 +2815,22 @@ def generate_policy_reminder_post(auth: Dict, platform: str = None) -> Optional[
 
 def maybe_generate_policy_post(auth: Dict):
     """Maybe generate a policy post (30% chance per run)."""
-    import random
     if random.random() < 0.3:  # 30% chance
-        platform = random.choice(list(PLATFORM_POLICIES.keys()))
+        platform = random.choice(_PLATFORM_KEYS)
         post_id = generate_policy_reminder_post(auth, platform)
         if post_id:
-            print(f"Generated policy reminder post for {platform} (ID: {post_id})")
+            logger.info(f"Generated policy reminder post for {platform} (ID: {post_id})")
             return True
     return False
 
 
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Creator Newsdesk news pipeline")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Ignore cached Brave results and LLM rewrites")
+    args = parser.parse_args()
+    if args.no_cache:
+        BRAVE_CACHE_ENABLED = False
+        LLM_CACHE_ENABLED = False
     main()
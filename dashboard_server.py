@@ -18,14 +18,26 @@ Author: Matthew Murphy
 License: MIT
 """
 
+import copy
+import io
 import json
 import os
+import stat
 import requests
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
 from datetime import datetime
 import threading
 import time
 
+import brave_fetch_news
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # File paths for status and configuration
 STATUS_FILE = "pipeline_status.json"
 CONFIG_FILE = "config.json"
@@ -48,20 +60,269 @@ default_status = {
 }
 
 
+# /api/fetch-50: searches run FETCH_WORKERS at a time over the first
+# FETCH_TERMS configured terms, FETCH_PER_TERM results each
+FETCH_LIMIT = 50
+FETCH_TERMS = 10
+FETCH_PER_TERM = 10
+FETCH_WORKERS = 8
+
+
+def config_search_terms(site):
+    """
+    Flatten a site's search structure into Brave search terms.
+    
+    Brand entries are either {"brands": [...]} (searched as-is) or a list
+    of terms searched as "<brand> <term>"; a category without brands is
+    searched by name.
+    
+    Args:
+        site (dict): Site configuration
+    
+    Returns:
+        list: Unique search terms, in configured order
+    """
+    terms = []
+    seen = set()
+    structure = (site.get("search") or {}).get("structure") or {}
+    for category, brands in structure.items():
+        if not isinstance(brands, dict):
+            candidates = [category]
+        else:
+            candidates = []
+            for brand, entry in brands.items():
+                if isinstance(entry, dict):
+                    candidates.extend(entry.get("brands") or [])
+                elif isinstance(entry, list):
+                    candidates.extend(f"{brand} {term}" for term in entry)
+                else:
+                    candidates.append(f"{brand} {entry}")
+        for term in candidates:
+            if isinstance(term, str) and term.strip() and term.strip().lower() not in seen:
+                seen.add(term.strip().lower())
+                terms.append(term.strip())
+    return terms
+
+
+def fetch_articles(terms, api_keys, limit=FETCH_LIMIT):
+    """
+    Search Brave for several terms concurrently.
+    
+    Keys are assigned round-robin; brave_fetch_news rate limits each key
+    and shares one keep-alive session across the searches.
+    
+    Args:
+        terms (list): Search terms
+        api_keys (list): Brave API keys
+        limit (int): Maximum number of articles to return
+    
+    Returns:
+        list: Up to limit articles, de-duplicated by URL
+    """
+    terms = terms[:FETCH_TERMS]
+    if not terms or not api_keys:
+        return []
+    
+    def fetch_term(i):
+        return brave_fetch_news.search_brave(
+            terms[i], api_key=api_keys[i % len(api_keys)], count=FETCH_PER_TERM
+        )
+    
+    articles = []
+    seen_urls = set()
+    with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(terms))) as ex:
+        for results in ex.map(fetch_term, range(len(terms))):
+            for article in results:
+                url = article.get("url")
+                if url and url not in seen_urls:
+                    seen_urls.add(url)
+                    articles.append(article)
+    return articles[:limit]
+
+
+# Parsed JSON files keyed by path: (mtime_ns, size, raw bytes, data)
+_FILE_CACHE = {}
+_FILE_CACHE_LOCK = threading.Lock()
+
+
+def json_loads(raw):
+    """Parse JSON bytes or str, using orjson if installed."""
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+
+def json_bytes(obj, indent=False):
+    """
+    Serialize obj to UTF-8 JSON bytes, using orjson if installed.
+    
+    Args:
+        obj: JSON-serializable value
+        indent (bool): Pretty-print with two-space indentation
+    
+    Returns:
+        bytes: Encoded JSON
+    """
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None).encode()
+
+
+def write_json_atomic(path, data, indent=True):
+    """
+    Write data as JSON without ever exposing a partial file.
+    
+    The JSON goes to a temp file that is renamed over path, so a crash
+    mid-write can't leave truncated JSON for load_status() to discard.
+    
+    Args:
+        path (str): Destination file
+        data: JSON-serializable value
+        indent (bool): Pretty-print (for files people edit by hand)
+    """
+    # Handlers run concurrently, so each writer gets its own temp file
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb", buffering=65536) as f:
+        f.write(json_bytes(data, indent=indent))
+    os.replace(tmp, path)
+
+
+def load_json_cached(path):
+    """
+    Read and parse a JSON file, re-reading it only when it changes.
+    
+    The dashboard polls status every few seconds and several handlers
+    read config.json; between writes those requests cost one stat().
+    The cached data is shared, so callers must not modify it.
+    
+    Args:
+        path (str): JSON file path
+    
+    Returns:
+        tuple: (mtime_ns, size, raw bytes, parsed data), or None if the
+        file doesn't exist or isn't valid JSON
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    with _FILE_CACHE_LOCK:
+        entry = _FILE_CACHE.get(path)
+    if entry and entry[:2] == (st.st_mtime_ns, st.st_size):
+        return entry
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+        entry = (st.st_mtime_ns, st.st_size, raw, json_loads(raw))
+    except (OSError, ValueError) as e:
+        print(f"Could not read {path}: {e}")
+        return None
+    with _FILE_CACHE_LOCK:
+        _FILE_CACHE[path] = entry
+    return entry
+
+
+def load_config():
+    """
+    Load the dashboard configuration.
+    
+    Returns:
+        dict: Parsed config.json (shared - treat as read-only), or {} if missing
+    """
+    entry = load_json_cached(CONFIG_FILE)
+    return entry[3] if entry else {}
+
+
+# Serializes status read-modify-write cycles across handler threads
+_STATUS_LOCK = threading.RLock()
+
+
+# Static files (dashboard.html, images) kept in memory, least recently
+# used evicted first; larger files are always read from disk
+STATIC_CACHE_MAX_FILE = 512 * 1024
+STATIC_CACHE_MAX_BYTES = 4 * 1024 * 1024
+STATIC_CACHE_MAX_ENTRIES = 32
+_STATIC_CACHE = OrderedDict()  # path -> (mtime_ns, size, bytes)
+_STATIC_CACHE_LOCK = threading.Lock()
+
+
+def read_static_cached(path, st):
+    """
+    Return a static file's contents from the in-memory LRU cache.
+    
+    Args:
+        path (str): File path
+        st (os.stat_result): Current stat of path; a changed mtime or
+            size invalidates the cached copy
+    
+    Returns:
+        bytes: File contents, or None if the file can't be read
+    """
+    key = (st.st_mtime_ns, st.st_size)
+    with _STATIC_CACHE_LOCK:
+        entry = _STATIC_CACHE.get(path)
+        if entry and entry[:2] == key:
+            _STATIC_CACHE.move_to_end(path)
+            return entry[2]
+    try:
+        with open(path, "rb") as f:
+            body = f.read()
+    except OSError:
+        return None
+    if len(body) != st.st_size:
+        # Changed while reading - serve it, cache it next time
+        return body
+    with _STATIC_CACHE_LOCK:
+        _STATIC_CACHE[path] = key + (body,)
+        _STATIC_CACHE.move_to_end(path)
+        total = sum(len(e[2]) for e in _STATIC_CACHE.values())
+        while len(_STATIC_CACHE) > 1 and (
+                len(_STATIC_CACHE) > STATIC_CACHE_MAX_ENTRIES or total > STATIC_CACHE_MAX_BYTES):
+            _, (_, _, evicted) = _STATIC_CACHE.popitem(last=False)
+            total -= len(evicted)
+    return body
+
+
+# (config mtime_ns, size) -> flattened search terms of the first site
+_TERMS_CACHE = (None, [])
+
+
+def configured_search_terms():
+    """
+    Search terms for the first configured site.
+    
+    The flattened list is rebuilt only when config.json changes.
+    
+    Returns:
+        list: Search terms (shared - treat as read-only)
+    """
+    global _TERMS_CACHE
+    entry = load_json_cached(CONFIG_FILE)
+    if not entry:
+        return []
+    key, terms = _TERMS_CACHE
+    if key != entry[:2]:
+        site = (entry[3].get("sites") or [{}])[0]
+        terms = config_search_terms(site)
+        _TERMS_CACHE = (entry[:2], terms)
+    return terms
+
+
 def load_status():
     """
     Load pipeline status from JSON file.
     
+    Keys missing from the file are filled in from default_status, so
+    callers can always index "stats" and the other fields.
+    
     Returns:
         dict: Current status or default_status if file doesn't exist
     """
-    if os.path.exists(STATUS_FILE):
-        try:
-            return json.load(open(STATUS_FILE))
-        except:
-            # If file is corrupted, return defaults
-            pass
-    return default_status.copy()
+    # Callers update and save the status, so always hand out a copy -
+    # a shallow copy of default_status would share its "stats" dict
+    status = copy.deepcopy(default_status)
+    entry = load_json_cached(STATUS_FILE)
+    if entry and isinstance(entry[3], dict):
+        status.update(copy.deepcopy(entry[3]))
+    return status
 
 
 def save_status(data):
@@ -71,7 +332,26 @@ def save_status(data):
     Args:
         data (dict): Status dictionary to save
     """
-    json.dump(data, open(STATUS_FILE, "w"), indent=2)
+    # Only programs read the status file, so it is written compact
+    with _STATUS_LOCK:
+        write_json_atomic(STATUS_FILE, data, indent=False)
+
+
+def update_status(**changes):
+    """
+    Update fields of the saved status in one locked read-modify-write.
+    
+    Concurrent handlers can't interleave between the load and the save,
+    so neither update is lost.
+    
+    Returns:
+        dict: The status as saved
+    """
+    with _STATUS_LOCK:
+        status = load_status()
+        status.update(changes)
+        save_status(status)
+    return status
 
 
 class Handler(SimpleHTTPRequestHandler):
@@ -84,27 +364,117 @@ class Handler(SimpleHTTPRequestHandler):
     - OpenClaw agent deployment
     """
     
+    def send_body(self, status, body, content_type='application/json', headers=None):
+        """
+        Send a complete response with Content-Length.
+        
+        The headers go out in one buffered flush and the body in a single
+        write.
+        
+        Args:
+            status (int): HTTP status code
+            body (bytes): Response body
+            content_type (str): Content-Type header value
+            headers (dict, optional): Extra headers
+        """
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def send_json(self, status, obj):
+        """Send obj as a JSON response."""
+        self.send_body(status, json_bytes(obj))
+    
+    def send_head(self):
+        """
+        Serve small static files from memory with ETag revalidation.
+        
+        Regular files up to STATIC_CACHE_MAX_FILE come from the LRU cache
+        with ETag, Last-Modified and Cache-Control headers, and a
+        matching If-None-Match gets a 304 without touching the file.
+        Directories, missing and large files use SimpleHTTPRequestHandler.
+        """
+        path = self.translate_path(self.path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return SimpleHTTPRequestHandler.send_head(self)
+        if (not stat.S_ISREG(st.st_mode) or path.endswith('/')
+                or st.st_size > STATIC_CACHE_MAX_FILE):
+            return SimpleHTTPRequestHandler.send_head(self)
+        
+        etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+        cache_headers = {
+            'ETag': etag,
+            'Last-Modified': self.date_time_string(st.st_mtime),
+            'Cache-Control': 'public, max-age=60'
+        }
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            for name, value in cache_headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return None
+        
+        body = read_static_cached(path, st)
+        if body is None:
+            return SimpleHTTPRequestHandler.send_head(self)
+        self.send_response(200)
+        self.send_header('Content-Type', self.guess_type(path))
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in cache_headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        return io.BytesIO(body)
+    
+    def copyfile(self, source, outputfile):
+        """
+        Copy a response body to the client.
+        
+        socket.sendfile() hands files on disk (the large images that
+        bypass the static cache) to os.sendfile, so the kernel moves the
+        bytes without copying them through Python; in-memory bodies fall
+        back to plain sends.
+        """
+        self.connection.sendfile(source)
+    
     def do_GET(self):
         """
         Handle GET requests for API endpoints and static files.
         """
-        # API: Get pipeline status
-        if self.path == '/api/status':
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(load_status()).encode())
+        # The dashboard adds ?t=<timestamp> to defeat browser caching
+        path, _, query = self.path.partition('?')
+        
+        # API: Get pipeline status (?pretty=1 for an indented copy)
+        if path == '/api/status' and 'pretty=1' in query.split('&'):
+            self.send_body(200, json_bytes(load_status(), indent=True))
+        elif path == '/api/status':
+            entry = load_json_cached(STATUS_FILE)
+            # Serve the file as-is; it only needs parsing when it changes
+            self.send_body(200, entry[2] if entry else json_bytes(default_status))
             
         # API: Get configuration
-        elif self.path == '/config.json' or self.path == '/api/config':
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            if os.path.exists(CONFIG_FILE):
-                self.wfile.write(open(CONFIG_FILE).read().encode())
-            else:
-                self.wfile.write(b'{}')
+        elif path == '/config.json' or path == '/api/config':
+            entry = load_json_cached(CONFIG_FILE)
+            etag = f'"{entry[0]:x}-{entry[1]:x}"' if entry else None
+            if etag and self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            self.send_body(200, entry[2] if entry else b'{}', headers={'ETag': etag} if etag else None)
                 
+        # API: Download the OpenClaw agent setup script
+        elif path == '/api/download-openclaw-agent':
+            self.send_body(200, OPENCLAW_AGENT_SCRIPT, content_type='application/x-sh', headers={
+                'Content-Disposition': 'attachment; filename="openclaw-agent.sh"',
+                'Cache-Control': 'no-store'
+            })
+            
         # Serve static files (dashboard.html, images, etc.)
         else:
             # Use default file serving for other requests
@@ -116,60 +486,41 @@ class Handler(SimpleHTTPRequestHandler):
         """
         # API: Run the news pipeline
         if self.path == '/api/run-pipeline':
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            
             # Update status to indicate pipeline is running
-            status = load_status()
-            status["running"] = True
-            status["started"] = datetime.now().isoformat()
-            status["stats"] = {"fetched": 0, "processed": 0, "created": 0, "skipped": 0, "errors": 0}
-            save_status(status)
+            update_status(
+                running=True,
+                started=datetime.now().isoformat(),
+                stats={"fetched": 0, "processed": 0, "created": 0, "skipped": 0, "errors": 0}
+            )
             
             # Note: Actual pipeline execution would be started in a separate thread
             # For now, we just update status. The actual pipeline (cnd_news_pipeline.py)
             # would need to be run separately or via subprocess
-            self.wfile.write(json.dumps({"status": "started"}).encode())
+            self.send_json(200, {"status": "started"})
             
         # API: Fetch 50 articles from Brave API
         elif self.path.startswith('/api/fetch-50'):
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            
             # Extract date parameter if provided
             date_param = "2025-02-01"
             if 'date=' in self.path:
                 date_param = self.path.split('date=')[1].split('&')[0]
             
             # Load config to get Brave API key
-            config = {}
-            if os.path.exists(CONFIG_FILE):
-                config = json.load(open(CONFIG_FILE))
+            config = load_config()
             
-            brave_keys = config.get("sites", [{}])[0].get("brave_keys", [])
-            api_key = brave_keys[0] if brave_keys else ""
+            site = config.get("sites", [{}])[0]
+            brave_keys = [k for k in site.get("brave_keys", []) if k]
             
-            # Fetch from Brave Search API
-            # This is a simplified example - actual implementation would
-            # use brave_fetch_news.py with proper search queries
+            # Fetch from Brave Search API; the configured terms are
+            # searched concurrently instead of one after another
             articles = []
-            if api_key:
+            if brave_keys:
                 try:
-                    # Example API call structure
-                    # response = requests.get(
-                    #     f"https://api.search.brave.com/res/v1/web/search?q=tech+news&count=50",
-                    #     headers={"X-Subscription-Token": api_key}
-                    # )
-                    # articles = response.json().get("web", {}).get("results", [])
-                    pass
+                    articles = fetch_articles(configured_search_terms(), brave_keys)
                 except Exception as e:
-                    status = load_status()
-                    status["lastError"] = str(e)
-                    save_status(status)
+                    update_status(lastError=str(e))
             
-            self.wfile.write(json.dumps({"articles": articles}).encode())
+            self.send_json(200, {"articles": articles})
             
         # API: Save configuration
         elif self.path == '/api/save-config':
@@ -177,40 +528,65 @@ class Handler(SimpleHTTPRequestHandler):
             body = self.rfile.read(content_length)
             
             try:
-                config_data = json.loads(body)
-                with open(CONFIG_FILE, 'w') as f:
-                    json.dump(config_data, f, indent=2)
-                self.send_response(200)
-                self.send_header('Content-Type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps({"status": "saved"}).encode())
+                config_data = json_loads(body)
+                write_json_atomic(CONFIG_FILE, config_data)
+                self.send_json(200, {"status": "saved"})
             except Exception as e:
-                self.send_response(400)
-                self.send_header('Content-Type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps({"error": str(e)}).encode())
+                self.send_json(400, {"error": str(e)})
                 
         # API: Deploy OpenClaw agent script
         elif self.path == '/api/deploy-openclaw':
-            self.send_response(200)
-            self.send_header('Content-Type', 'text/plain')
-            self.end_headers()
-            
-            # Load config for API keys
-            config = {}
-            if os.path.exists(CONFIG_FILE):
-                config = json.load(open(CONFIG_FILE))
-            
-            site = config.get("sites", [{}])[0] if config.get("sites") else {}
-            xai_key = ""
-            if site:
-                xai = site.get("external_ai", {}).get("xai", {})
-                xai_key = xai.get("api_key", "")
+            self.send_body(200, OPENCLAW_AGENT_SCRIPT, content_type='text/plain')
             
-            # Generate shell script to set up OpenClaw agent
-            # This script would be run on the user's Mac to set up
-            # the OpenClaw agent for image generation
-            script = f"""#!/bin/bash
+        else:
+            self.send_body(404, b'', content_type='text/plain')
+
+
+class BoundedHTTPServer(ThreadingHTTPServer):
+    """
+    HTTP server that handles requests on a fixed-size thread pool.
+    
+    ThreadingHTTPServer starts a new thread per request with no upper
+    bound. Here at most max_workers requests run at once; when all
+    workers are busy a new connection gets an immediate 503 with
+    Retry-After instead of queueing behind slow handlers.
+    """
+    daemon_threads = True
+    
+    def __init__(self, server_address, handler_class, max_workers=32):
+        super().__init__(server_address, handler_class)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.slots = threading.BoundedSemaphore(max_workers)
+    
+    def process_request(self, request, client_address):
+        if not self.slots.acquire(blocking=False):
+            try:
+                request.sendall(
+                    b"HTTP/1.0 503 Service Unavailable\r\n"
+                    b"Retry-After: 1\r\n"
+                    b"Content-Length: 0\r\n\r\n"
+                )
+            except OSError:
+                pass
+            self.shutdown_request(request)
+            return
+        self.executor.submit(self._process_in_slot, request, client_address)
+    
+    def _process_in_slot(self, request, client_address):
+        try:
+            self.process_request_thread(request, client_address)
+        finally:
+            self.slots.release()
+    
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=False)
+
+
+# Shell script that sets up the OpenClaw agent on the user's Mac for image
+# generation. It is the same for every request, so it is encoded once; API
+# keys are added by the user in the generated config, never served here.
+OPENCLAW_AGENT_SCRIPT = b"""#!/bin/bash
 # CND OpenClaw Agent Setup Script
 # Run this on your Mac: chmod +x openclaw-agent.sh && ./openclaw-agent.sh
 
@@ -222,29 +598,23 @@ mkdir -p ~/.cnd-openclaw
 
 # Write configuration file
 cat > ~/.cnd-openclaw/config.json << 'CFEOF'
-{{
+{
     "xai_api_key": "YOUR_XAI_KEY_HERE",
     "dashboard_url": "http://192.168.88.11:8888",
     "wp_api_base": "https://www.creatornewsdesk.com/wp-json",
-    "providers": {{
-        "openclaw": {{"enabled": true, "url": "http://localhost:8050"}},
-        "xai": {{"enabled": true}},
-        "comfyui": {{"enabled": false, "url": "http://localhost:8188"}},
-        "a1111": {{"enabled": false, "url": "http://localhost:7860"}}
-    }},
+    "providers": {
+        "openclaw": {"enabled": true, "url": "http://localhost:8050"},
+        "xai": {"enabled": true},
+        "comfyui": {"enabled": false, "url": "http://localhost:8188"},
+        "a1111": {"enabled": false, "url": "http://localhost:7860"}
+    },
     "fallback_chain": ["openclaw", "xai", "comfyui", "a1111"]
-}}
+}
 CFEOF
 
 echo "Config saved to ~/.cnd-openclaw/config.json"
 echo "Edit the config file to add your API keys, then run the agent."
 """
-            
-            self.wfile.write(script.encode())
-            
-        else:
-            self.send_response(404)
-            self.end_headers()
 
 
 def run_pipeline_thread():
@@ -262,6 +632,8 @@ def run_pipeline_thread():
 
 # Server configuration
 PORT = 8888
+# Requests handled at once; more concurrent requests get a 503
+SERVER_WORKERS = int(os.environ.get("DASHBOARD_WORKERS", "32"))
 
 
 if __name__ == '__main__':
@@ -276,6 +648,7 @@ if __name__ == '__main__':
     print("=" * 50)
     
     # Create and start HTTP server
-    # Handler class handles all HTTP requests
-    server = HTTPServer(('0.0.0.0', PORT), Handler)
+    # Handler class handles all HTTP requests; requests run on a bounded
+    # pool so a slow Brave fetch or deploy doesn't stall status polls
+    server = BoundedHTTPServer(('0.0.0.0', PORT), Handler, max_workers=SERVER_WORKERS)
     server.serve_forever()
@@ -21,10 +21,26 @@ License: MIT
 import os
 import json
 import re
+import hashlib
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, Optional
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# With ijson, only the message content is decoded from LLM responses
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 # =============================================================================
 # Configuration
 # =============================================================================
@@ -32,6 +48,55 @@ from typing import Dict, Optional
 # Get configuration from environment variables
 # See .env.example for all available options
 
+# Shared HTTP session - calls to the same provider reuse keep-alive
+# connections (generation POSTs are not retried)
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=2,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False
+    )
+)
+# The local LLM is plain http
+_SESSION.mount("https://", _ADAPTER)
+_SESSION.mount("http://", _ADAPTER)
+
+# System messages are the same for every request; they are only read
+_LOCAL_SYSTEM_MESSAGE = {"role": "system", "content": "You are a professional tech news writer for a creator-focused news site."}
+_HOSTED_SYSTEM_MESSAGE = {"role": "system", "content": "You are a professional tech news writer."}
+
+# On-disk cache of generated articles: the same source article rewritten
+# by the same provider and model is answered without another LLM call.
+# Set LLM_CACHE=0 to disable
+LLM_CACHE_DIR = ".llm_post_cache"
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE", "1") != "0"
+
+# Stream local LLM output as server-sent events, so a reply that is not
+# JSON is dropped at its first characters instead of after max_tokens.
+# Set LOCAL_LLM_STREAM=0 to wait for a single buffered response
+LOCAL_LLM_STREAM = os.environ.get("LOCAL_LLM_STREAM", "1") != "0"
+# Sampling for every provider: low temperature plus a fixed seed, so
+# the same prompt gives the same rewrite and reruns are reproducible.
+# Set LLM_SEED to empty to leave sampling unseeded
+LLM_TEMPERATURE = float(os.environ.get("LLM_TEMPERATURE", "0.2"))
+LLM_SEED = os.environ.get("LLM_SEED", "42").strip()
+_SAMPLING = {"temperature": LLM_TEMPERATURE}
+if LLM_SEED:
+    _SAMPLING["seed"] = int(LLM_SEED)
+
+# Output characters allowed before the JSON object has to have started
+_STREAM_PROBE_CHARS = 200
+
+# Whitespace runs collapsed by clamp(), and the code fence an LLM may wrap
+# its JSON in (stripped by extract_json)
+_WS_RE = re.compile(r"\s+")
+_FENCE_HEAD_RE = re.compile(r"^```(?:json)?\s*")
+_FENCE_TAIL_RE = re.compile(r"\s*```$")
+
 def get_env(key: str, default=None, required: bool = False):
     """
     Get environment variable with optional default and required check.
@@ -67,10 +132,50 @@ def clamp(s: str, n: int) -> str:
         s = ""
     s = str(s)
     # Remove extra whitespace
-    s = re.sub(r"\s+", " ", s).strip()
+    s = _WS_RE.sub(" ", s).strip()
     return s[:n]
 
 
+def _find_json_object(s: str) -> str:
+    """
+    Return the first balanced {...} object in s.
+    
+    A single pass tracking brace depth, ignoring braces inside string
+    literals (and escaped quotes within them) - no regex backtracking
+    over the HTML in a long reply.
+    
+    Args:
+        s (str): Text containing a JSON object
+    
+    Returns:
+        str: The object's text, or empty string if none is complete
+    """
+    start = s.find("{")
+    if start < 0:
+        return ""
+    depth = 0
+    in_str = False
+    esc = False
+    for i in range(start, len(s)):
+        c = s[i]
+        if in_str:
+            if esc:
+                esc = False
+            elif c == "\\":
+                esc = True
+            elif c == '"':
+                in_str = False
+        elif c == '"':
+            in_str = True
+        elif c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                return s[start:i + 1]
+    return ""
+
+
 def extract_json(text: str) -> dict:
     """
     Extract JSON from LLM response text.
@@ -86,13 +191,91 @@ def extract_json(text: str) -> dict:
     """
     text = (text or "").strip()
     # Remove code fences if any
-    text = re.sub(r"^```(?:json)?\s*", "", text)
-    text = re.sub(r"\s*```$", "", text)
+    if text.startswith("```"):
+        text = _FENCE_HEAD_RE.sub("", text)
+    if text.endswith("```"):
+        text = _FENCE_TAIL_RE.sub("", text)
     
     try:
-        return json.loads(text)
+        # orjson's JSONDecodeError subclasses json's
+        return orjson.loads(text) if orjson else json.loads(text)
     except json.JSONDecodeError:
+        pass
+    
+    # Prose before or after the object: parse just the object
+    obj = _find_json_object(text)
+    if not obj:
         return {}
+    try:
+        return orjson.loads(obj) if orjson else json.loads(obj)
+    except json.JSONDecodeError:
+        return {}
+
+
+def completion_content(resp) -> str:
+    """
+    Return the message content of a chat completion response.
+    
+    With ijson installed the response is streamed and only the content
+    string is decoded, without building the rest of the JSON tree;
+    otherwise the body is parsed whole (from its bytes with orjson if
+    installed).
+    
+    Args:
+        resp (requests.Response): Chat completion response (streamed if ijson)
+    
+    Returns:
+        str: Content of the first choice
+    """
+    if ijson is None:
+        data = orjson.loads(resp.content) if orjson else resp.json()
+        return data["choices"][0]["message"]["content"]
+    # Let urllib3 undo gzip/deflate before ijson sees the bytes
+    resp.raw.decode_content = True
+    return next(ijson.items(resp.raw, "choices.item.message.content"))
+
+
+def streamed_completion_content(resp) -> str:
+    """
+    Collect the message content of a streamed (SSE) chat completion.
+    
+    Content deltas are joined as they arrive. If no "{" has appeared in
+    the first _STREAM_PROBE_CHARS characters the model is writing prose
+    rather than the requested JSON, so the stream is abandoned; closing
+    the connection stops the server generating the rest.
+    
+    Args:
+        resp (requests.Response): Streamed chat completion response
+    
+    Returns:
+        str: Content of the first choice, or empty string if abandoned
+    """
+    parts = []
+    seen = 0
+    checked = False
+    for line in resp.iter_lines():
+        if not line.startswith(b"data:"):
+            continue
+        data = line[5:].strip()
+        if data == b"[DONE]":
+            break
+        try:
+            chunk = orjson.loads(data) if orjson else json.loads(data)
+        except ValueError:
+            continue
+        delta = ((chunk.get("choices") or [{}])[0].get("delta") or {}).get("content")
+        if not delta:
+            continue
+        parts.append(delta)
+        if not checked:
+            if "{" in delta:
+                checked = True
+            else:
+                seen += len(delta)
+                if seen >= _STREAM_PROBE_CHARS:
+                    print(f"Local LLM reply is not JSON, stopping: {''.join(parts)[:40]!r}")
+                    return ""
+    return "".join(parts)
 
 
 def generate_with_local_llm(prompt: str, model: str = None) -> str:
@@ -112,23 +295,27 @@ def generate_with_local_llm(prompt: str, model: str = None) -> str:
     model_name = model or get_env("LOCAL_LLM_MODEL", "Mistral-7B-Instruct-v0.3-Q4_K_M.gguf")
     
     try:
-        resp = requests.post(
+        resp = _SESSION.post(
             f"{base_url}/v1/chat/completions",
             json={
                 "model": model_name,
                 "messages": [
-                    {"role": "system", "content": "You are a professional tech news writer for a creator-focused news site."},
+                    _LOCAL_SYSTEM_MESSAGE,
                     {"role": "user", "content": prompt}
                 ],
-                "temperature": 0.7,
-                "max_tokens": 2000
+                **_SAMPLING,
+                "max_tokens": 2000,
+                "stream": LOCAL_LLM_STREAM
             },
-            timeout=120
+            timeout=120,
+            stream=LOCAL_LLM_STREAM or ijson is not None
         )
         
-        if resp.status_code == 200:
-            data = resp.json()
-            return data["choices"][0]["message"]["content"]
+        with resp:
+            if resp.status_code == 200:
+                if LOCAL_LLM_STREAM:
+                    return streamed_completion_content(resp)
+                return completion_content(resp)
     
     except Exception as e:
         print(f"Local LLM error: {e}")
@@ -154,7 +341,7 @@ def generate_with_xai(prompt: str, model: str = "grok-2-1212") -> str:
         return ""
     
     try:
-        resp = requests.post(
+        resp = _SESSION.post(
             "https://api.x.ai/v1/chat/completions",
             headers={
                 "Authorization": f"Bearer {api_key}",
@@ -163,17 +350,18 @@ def generate_with_xai(prompt: str, model: str = "grok-2-1212") -> str:
             json={
                 "model": model,
                 "messages": [
-                    {"role": "system", "content": "You are a professional tech news writer."},
+                    _HOSTED_SYSTEM_MESSAGE,
                     {"role": "user", "content": prompt}
                 ],
-                "temperature": 0.7
+                **_SAMPLING
             },
-            timeout=60
+            timeout=60,
+            stream=ijson is not None
         )
         
-        if resp.status_code == 200:
-            data = resp.json()
-            return data["choices"][0]["message"]["content"]
+        with resp:
+            if resp.status_code == 200:
+                return completion_content(resp)
     
     except Exception as e:
         print(f"xAI error: {e}")
@@ -199,7 +387,7 @@ def generate_with_openai(prompt: str, model: str = "gpt-4o") -> str:
         return ""
     
     try:
-        resp = requests.post(
+        resp = _SESSION.post(
             "https://api.openai.com/v1/chat/completions",
             headers={
                 "Authorization": f"Bearer {api_key}",
@@ -208,17 +396,18 @@ def generate_with_openai(prompt: str, model: str = "gpt-4o") -> str:
             json={
                 "model": model,
                 "messages": [
-                    {"role": "system", "content": "You are a professional tech news writer."},
+                    _HOSTED_SYSTEM_MESSAGE,
                     {"role": "user", "content": prompt}
                 ],
-                "temperature": 0.7
+                **_SAMPLING
             },
-            timeout=60
+            timeout=60,
+            stream=ijson is not None
         )
         
-        if resp.status_code == 200:
-            data = resp.json()
-            return data["choices"][0]["message"]["content"]
+        with resp:
+            if resp.status_code == 200:
+                return completion_content(resp)
     
     except Exception as e:
         print(f"OpenAI error: {e}")
@@ -226,42 +415,191 @@ def generate_with_openai(prompt: str, model: str = "gpt-4o") -> str:
     return ""
 
 
-def generate_article(article: Dict, provider: str = "local") -> Dict:
-    """
-    Generate a rewritten news article using specified AI provider.
-    
-    Takes an article from Brave API and rewrites it using the configured
-    AI provider into engaging content for Creator Newsdesk.
-    
-    Args:
-        article (dict): Article with 'title', 'description', 'url', 'domain'
-        provider (str): AI provider to use ('local', 'xai', 'openai')
-    
-    Returns:
-        dict: Generated article with 'title', 'content', 'excerpt', 'tags'
-    """
-    # Build prompt for rewriting
-    prompt = f"""Rewrite this news article for a tech news website targeting content creators.
+# Fixed parts of the rewrite prompt around the article fields. All the
+# instructions come before the article, so every request in a batch
+# shares the same prompt prefix and llama.cpp can reuse its KV cache
+# for it instead of re-evaluating those tokens per article.
+_PROMPT_PREFIX = """Rewrite this news article for a tech news website targeting content creators.
 Keep it informative, engaging, and suitable for a professional audience.
 
-Title: {article.get('title', '')}
-Source: {article.get('domain', '')}
-Description: {article.get('description', '')}
-
 Write a new article with:
 1. An engaging title
 2. 3-4 paragraphs of content
 3. A brief excerpt (2 sentences)
 
 Format your response as JSON:
-{{
+{
     "title": "New engaging title",
     "content": "Full article content in HTML with <p> tags",
     "excerpt": "Brief excerpt",
     "tags": ["tag1", "tag2", "tag3"]
-}}
+}
+
+Article:
+"""
+_PROMPT_SUFFIX = """
 
 Write the article now:"""
+
+
+def _generation_cache_path(provider: str, prompt: str) -> str:
+    """
+    Build the cache file path for a rewrite request.
+    
+    The key covers the provider, the model it uses and the full prompt,
+    so a different model or prompt template is a cache miss.
+    
+    Args:
+        provider (str): AI provider
+        prompt (str): Rewrite prompt
+    
+    Returns:
+        str: Path of the cache file for this request
+    """
+    model = get_env("LOCAL_LLM_MODEL", "Mistral-7B-Instruct-v0.3-Q4_K_M.gguf") if provider == "local" else ""
+    key = hashlib.blake2b(f"{provider}\n{model}\n{prompt}".encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(LLM_CACHE_DIR, f"{key}.json")
+
+
+def _generation_cache_read(path: str) -> Optional[Dict]:
+    """
+    Read a cached generated article.
+    
+    Args:
+        path (str): Cache file path
+    
+    Returns:
+        dict: Cached article, or None on a miss (or any cache error)
+    """
+    if not LLM_CACHE_ENABLED:
+        return None
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+        return orjson.loads(raw) if orjson else json.loads(raw)
+    except (OSError, ValueError):
+        return None
+
+
+def _generation_cache_write(path: str, generated: Dict) -> None:
+    """
+    Atomically write a generated article to the cache.
+    
+    Args:
+        path (str): Cache file path
+        generated (dict): Article returned by generate_article
+    """
+    if not LLM_CACHE_ENABLED:
+        return
+    try:
+        os.makedirs(LLM_CACHE_DIR, exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(orjson.dumps(generated) if orjson else json.dumps(generated).encode("utf-8"))
+        os.replace(tmp, path)
+    except (OSError, TypeError, ValueError) as e:
+        print(f"LLM cache write error: {e}")
+
+
+# Most tags kept from a rewrite
+MAX_TAGS = 8
+
+# Token budget for the article description in the prompt. Prompt
+# evaluation time grows with its length, and a pasted full article adds
+# little over its first few paragraphs. Estimated at ~4 characters per
+# token, which is close for English with Mistral/GPT tokenizers.
+PROMPT_DESC_TOKENS = int(os.environ.get("PROMPT_DESC_TOKENS", "800"))
+_CHARS_PER_TOKEN = 4
+
+
+def trim_to_token_budget(text: str, max_tokens: int) -> str:
+    """
+    Collapse whitespace and cut text to roughly max_tokens tokens.
+    
+    The cut is made at the last sentence end inside the budget (or the
+    last word, if no sentence ends in its second half).
+    
+    Args:
+        text (str): Text to trim
+        max_tokens (int): Token budget (<= 0 disables trimming)
+    
+    Returns:
+        str: Trimmed text
+    """
+    text = " ".join((text or "").split())
+    limit = max_tokens * _CHARS_PER_TOKEN
+    if max_tokens <= 0 or len(text) <= limit:
+        return text
+    cut = text[:limit]
+    end = max(cut.rfind(". "), cut.rfind("! "), cut.rfind("? "))
+    if end >= limit // 2:
+        return cut[:end + 1]
+    space = cut.rfind(" ")
+    return cut[:space] if space > 0 else cut
+
+
+def coerce_generated(generated: Dict, article: Dict) -> Dict:
+    """
+    Check the LLM's JSON against the expected article shape.
+    
+    All structural checks live here: string fields that are missing or
+    not strings fall back to the source article, and tags become a list
+    of at most MAX_TAGS non-empty strings (a comma-separated string is
+    split rather than passed on as one tag).
+    
+    Args:
+        generated (dict): Parsed LLM output (may be empty)
+        article (dict): Source article, for fallbacks
+    
+    Returns:
+        dict: Article with 'title', 'content', 'excerpt', 'tags'
+    """
+    def text(key, fallback=""):
+        value = generated.get(key)
+        return value.strip() if isinstance(value, str) and value.strip() else fallback
+    
+    tags = generated.get("tags")
+    if isinstance(tags, str):
+        tags = tags.split(",")
+    if not isinstance(tags, list):
+        tags = []
+    tags = [t.strip() for t in tags if isinstance(t, str) and t.strip()][:MAX_TAGS]
+    
+    return {
+        "title": text("title", article.get("title", "")),
+        "content": text("content", article.get("description", "")),
+        "excerpt": text("excerpt"),
+        "tags": tags
+    }
+
+
+def generate_article(article: Dict, provider: str = "local") -> Dict:
+    """
+    Generate a rewritten news article using specified AI provider.
+    
+    Takes an article from Brave API and rewrites it using the configured
+    AI provider into engaging content for Creator Newsdesk. Successful
+    rewrites are cached on disk (see LLM_CACHE_DIR).
+    
+    Args:
+        article (dict): Article with 'title', 'description', 'url', 'domain'
+        provider (str): AI provider to use ('local', 'xai', 'openai')
+    
+    Returns:
+        dict: Generated article with 'title', 'content', 'excerpt', 'tags'
+    """
+    # Build prompt for rewriting; only the article fields vary
+    prompt = (
+        f"{_PROMPT_PREFIX}Title: {article.get('title', '')}\n"
+        f"Source: {article.get('domain', '')}\n"
+        f"Description: {trim_to_token_budget(article.get('description', ''), PROMPT_DESC_TOKENS)}"
+        f"{_PROMPT_SUFFIX}"
+    )
+    
+    cache_path = _generation_cache_path(provider, prompt)
+    cached = _generation_cache_read(cache_path)
+    if cached is not None:
+        return cached
     
     # Generate based on provider
     if provider == "xai":
@@ -282,19 +620,42 @@ Write the article now:"""
     
     # Extract JSON from response
     generated = extract_json(result)
+    output = coerce_generated(generated, article)
     
-    return {
-        "title": generated.get("title", article.get("title", "")),
-        "content": generated.get("content", article.get("description", "")),
-        "excerpt": generated.get("excerpt", ""),
-        "tags": generated.get("tags", [])
-    }
+    # Only a real rewrite is cached; unparseable output is retried next time
+    content = generated.get("content")
+    if isinstance(content, str) and content.strip():
+        _generation_cache_write(cache_path, output)
+    return output
+
+
+def batch_workers(provider: str) -> int:
+    """
+    Number of articles generate_batch rewrites at once.
+    
+    LLM_PARALLEL overrides the default of 1 for the local llama.cpp
+    server (match its --parallel slots; extra requests would only queue
+    there and run into the timeout) and 8 for hosted APIs.
+    
+    Args:
+        provider (str): AI provider to use
+    
+    Returns:
+        int: Concurrent requests
+    """
+    value = get_env("LLM_PARALLEL")
+    if value:
+        return max(1, int(value))
+    return 1 if provider == "local" else 8
 
 
 def generate_batch(articles: list, provider: str = "local") -> list:
     """
     Generate rewritten articles for a list of articles.
     
+    Articles are independent, so up to batch_workers(provider) requests
+    are in flight at once; results keep the order of articles.
+    
     Args:
         articles (list): List of article dictionaries
         provider (str): AI provider to use
@@ -302,15 +663,17 @@ def generate_batch(articles: list, provider: str = "local") -> list:
     Returns:
         list: List of generated article dictionaries
     """
-    results = []
+    if not articles:
+        return []
     
-    for i, article in enumerate(articles):
+    def process(item):
+        i, article = item
         print(f"Processing article {i+1}/{len(articles)}: {article.get('title', '')[:50]}...")
-        
-        generated = generate_article(article, provider)
-        results.append(generated)
+        return generate_article(article, provider)
     
-    return results
+    workers = min(batch_workers(provider), len(articles))
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(process, enumerate(articles)))
 
 
 # Main entry point
@@ -318,20 +681,28 @@ if __name__ == "__main__":
     import argparse
     
     parser = argparse.ArgumentParser(description="Generate AI-written news posts")
-    parser.add_argument("--article", help="Article title/content to rewrite")
+    parser.add_argument("--article", action="append",
+                        help="Article title/content to rewrite (repeat for a batch)")
     parser.add_argument("--provider", default="local", choices=["local", "xai", "openai"], help="AI provider")
     parser.add_argument("--model", help="Model name (provider-specific)")
     
     args = parser.parse_args()
     
     if args.article:
-        # Generate single article
-        article = {"title": "Sample", "description": args.article, "domain": "example.com"}
-        result = generate_article(article, args.provider)
+        # Several articles are rewritten concurrently by generate_batch
+        articles = [
+            {"title": "Sample", "description": text, "domain": "example.com"}
+            for text in args.article
+        ]
+        if len(articles) == 1:
+            results = [generate_article(articles[0], args.provider)]
+        else:
+            results = generate_batch(articles, args.provider)
         
-        print("\n=== Generated Article ===")
-        print(f"Title: {result['title']}")
-        print(f"Content: {result['content']}")
-        print(f"Tags: {result['tags']}")
+        for result in results:
+            print("\n=== Generated Article ===")
+            print(f"Title: {result['title']}")
+            print(f"Content: {result['content']}")
+            print(f"Tags: {result['tags']}")
     else:
         print("Usage: python3 llm_generate_post.py --article 'Your article text here'")
@@ -31,24 +31,57 @@ import json
 import argparse
 from typing import Dict, List, Optional
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Loaded configuration and the config.json mtime it was built from
+_CONFIG_CACHE = (None, None)
+
 
 def load_config() -> Dict:
     """
     Load configuration from config.json and environment.
     
+    The active site and its flattened search terms are worked out once
+    here, at load time. The result is reused until config.json's mtime
+    changes, so repeated runs in one process don't re-read or re-walk
+    it. Callers must treat the returned dict as read-only.
+    
     Returns:
-        dict: Configuration dictionary
+        dict: 'raw' (parsed config.json), 'active_site' (site config or
+        None) and 'terms' (tuple of the active site's search terms)
     """
-    config = {}
+    global _CONFIG_CACHE
     
     # Try to load config.json
-    if os.path.exists("config.json"):
+    try:
+        mtime = os.stat("config.json").st_mtime_ns
+    except OSError:
+        mtime = None
+    if mtime is not None and _CONFIG_CACHE[0] == mtime:
+        return _CONFIG_CACHE[1]
+    
+    raw_config = {}
+    if mtime is not None:
         try:
-            with open("config.json") as f:
-                config = json.load(f)
+            with open("config.json", "rb") as f:
+                raw = f.read()
+            raw_config = orjson.loads(raw) if orjson else json.loads(raw)
         except Exception as e:
             print(f"Error loading config.json: {e}")
+            mtime = None
     
+    site = get_site_config(raw_config)
+    config = {
+        "raw": raw_config,
+        "active_site": site,
+        "terms": site_search_terms(site) if site else ()
+    }
+    if mtime is not None:
+        _CONFIG_CACHE = (mtime, config)
     return config
 
 
@@ -63,10 +96,31 @@ def get_site_config(config: Dict) -> Optional[Dict]:
         dict: Active site config or None
     """
     sites = config.get("sites", [])
-    for site in sites:
-        if site.get("active", False):
-            return site
-    return sites[0] if sites else None
+    return next((site for site in sites if site.get("active", False)),
+                sites[0] if sites else None)
+
+
+def site_search_terms(site: Dict) -> tuple:
+    """
+    Flatten a site's search structure into its search terms.
+    
+    Brands are used where a category lists them, otherwise the category
+    itself; repeated terms are kept once, in first-seen order.
+    
+    Args:
+        site (dict): Site configuration
+    
+    Returns:
+        tuple: Search terms
+    """
+    structure = site.get("search", {}).get("structure", {})
+    terms = []
+    for category, brands in structure.items():
+        if isinstance(brands, dict):
+            terms.extend(brands.keys())
+        else:
+            terms.append(category)
+    return tuple(dict.fromkeys(terms))
 
 
 def main():
@@ -94,7 +148,7 @@ def main():
     
     # Load configuration
     config = load_config()
-    site = get_site_config(config)
+    site = config["active_site"]
     
     if not site:
         print("Error: No active site found in configuration")
@@ -117,20 +171,8 @@ def main():
             # Import and run brave fetch
             from brave_fetch_news import fetch_all_news
             
-            # Get search terms from config
-            search_config = site.get("search", {})
-            structure = search_config.get("structure", {})
-            
-            # Build search terms from structure
-            terms = []
-            for category, brands in structure.items():
-                if isinstance(brands, dict):
-                    for brand in brands.keys():
-                        terms.append(brand)
-                else:
-                    terms.append(category)
-            
-            articles = fetch_all_news(terms=terms[:args.limit])
+            # Search terms were flattened from the site's structure at load
+            articles = fetch_all_news(terms=list(config["terms"][:args.limit]))
             results["fetched"] = len(articles)
             print(f"Fetched {results['fetched']} articles")
             
@@ -14,8 +14,14 @@ License: MIT
 
 import os
 import json
+import functools
 from typing import Dict, List
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 def load_search_terms() -> Dict[str, any]:
     """
@@ -23,7 +29,8 @@ def load_search_terms() -> Dict[str, any]:
     
     Reads SEARCH_TERMS_JSON from environment, validates it's a list
     of strings, removes duplicates (case-insensitive), and returns
-    cleaned list.
+    cleaned list. The parse is cached per distinct SEARCH_TERMS_JSON
+    value, so repeated calls in one process only re-read the variable.
     
     Returns:
         dict: Object with 'terms' (list) and 'count' (int)
@@ -32,23 +39,41 @@ def load_search_terms() -> Dict[str, any]:
         Exception: If SEARCH_TERMS_JSON is missing or invalid
     """
     # Try to get from environment
-    raw = os.environ.get("SEARCH_TERMS_JSON", "")
+    raw = os.environ.get("SEARCH_TERMS_JSON", "").strip()
     
     # Try loading .env file if available
-    if not raw or not str(raw).strip():
+    if not raw:
         try:
             from dotenv import load_dotenv
             load_dotenv()
-            raw = os.environ.get("SEARCH_TERMS_JSON", "")
+            raw = os.environ.get("SEARCH_TERMS_JSON", "").strip()
         except ImportError:
             pass
     
-    if not raw or not str(raw).strip():
+    if not raw:
         raise Exception("Missing environment variable: SEARCH_TERMS_JSON")
 
+    terms = _parse_search_terms(raw)
+    return {"terms": list(terms), "count": len(terms)}
+
+
+@functools.lru_cache(maxsize=4)
+def _parse_search_terms(raw: str) -> tuple:
+    """
+    Parse, validate and de-duplicate a SEARCH_TERMS_JSON value.
+    
+    Args:
+        raw (str): SEARCH_TERMS_JSON contents
+    
+    Returns:
+        tuple: Cleaned terms, first spelling of each kept
+    
+    Raises:
+        Exception: If the value is not a JSON array of strings
+    """
     # Parse JSON
     try:
-        terms = json.loads(raw) if isinstance(raw, str) else raw
+        terms = orjson.loads(raw) if orjson else json.loads(raw)
     except Exception as e:
         raise Exception(f"SEARCH_TERMS_JSON is not valid JSON: {e}")
 
@@ -60,15 +85,11 @@ def load_search_terms() -> Dict[str, any]:
     terms = [t.strip() for t in terms if t and t.strip()]
 
     # Deduplicate while preserving order (case-insensitive)
-    seen = set()
-    out = []
+    first = {}
     for t in terms:
-        key = t.lower()
-        if key not in seen:
-            seen.add(key)
-            out.append(t)
+        first.setdefault(t.lower(), t)
 
-    return {"terms": out, "count": len(out)}
+    return tuple(first.values())
 
 
 def main():
@@ -0,0 +1,101 @@
+"""
+Wire-level test for the image worker's media upload.
+
+Serves an image and a fake /wp/v2/media endpoint from a local HTTP server
+and checks the upload request carries exactly one framing header.
+
+Usage:
+    python3 -m unittest discover -s tests
+
+Author: Matthew Murphy
+License: MIT
+"""
+
+import os
+import json
+import threading
+import unittest
+import importlib.util
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import requests
+except ImportError:
+    requests = None
+
+WORKER_PATH = os.path.join(os.path.dirname(__file__), "..", "cnd-image-worker-hourly.py")
+IMAGE = b"\x89PNG\r\n\x1a\n" + b"\x00" * 1000
+
+
+def load_worker():
+    """Import cnd-image-worker-hourly.py (its name isn't importable)."""
+    spec = importlib.util.spec_from_file_location("cnd_image_worker", WORKER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class CaptureHandler(BaseHTTPRequestHandler):
+    """Serves IMAGE on GET and records the headers of each POST."""
+    
+    uploads = []
+    
+    def log_message(self, *args):
+        pass
+    
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(IMAGE)))
+        self.end_headers()
+        self.wfile.write(IMAGE)
+    
+    def do_POST(self):
+        headers = {k.lower(): v for k, v in self.headers.items()}
+        body = b""
+        if "transfer-encoding" not in headers:
+            body = self.rfile.read(int(headers.get("content-length", "0")))
+        self.uploads.append((headers, body))
+        payload = json.dumps({"id": 7}).encode()
+        self.send_response(201)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(payload)
+        self.close_connection = True
+
+
+@unittest.skipIf(requests is None, "requests is not installed")
+class UploadFramingTest(unittest.TestCase):
+    
+    def setUp(self):
+        CaptureHandler.uploads = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), CaptureHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.old_base = os.environ.get("WP_API_BASE")
+        os.environ["WP_API_BASE"] = f"{self.base}/wp-json"
+        self.worker = load_worker()
+    
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self.old_base is None:
+            os.environ.pop("WP_API_BASE", None)
+        else:
+            os.environ["WP_API_BASE"] = self.old_base
+    
+    def test_upload_sends_only_content_length(self):
+        media_id = self.worker.upload_to_wordpress(f"{self.base}/image.png", 42)
+        
+        self.assertEqual(media_id, 7)
+        self.assertEqual(len(CaptureHandler.uploads), 1)
+        headers, body = CaptureHandler.uploads[0]
+        self.assertNotIn("transfer-encoding", headers)
+        self.assertEqual(headers.get("content-length"), str(len(IMAGE)))
+        self.assertEqual(body, IMAGE)
+
+
+if __name__ == "__main__":
+    unittest.main()
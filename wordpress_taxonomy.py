@@ -21,9 +21,18 @@ License: MIT
 import os
 import json
 import re
+import html
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, List, Any, Optional
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 # =============================================================================
 # Configuration
@@ -39,6 +48,22 @@ WP_API_BASE = get_env("WP_API_BASE", "https://www.creatornewsdesk.com/wp-json")
 WP_USER = get_env("WP_USER", "")
 WP_APP_PASSWORD = get_env("WP_APP_PASSWORD", "")
 
+# (connect, read) timeout for WordPress REST calls
+WP_TIMEOUT = (5, 15)
+
+
+_WS_RE = re.compile(r"\s+")
+
+
+def response_json(resp) -> Any:
+    """
+    Parse a REST response body.
+    
+    Uses orjson on the raw bytes when installed, instead of requests'
+    text decoding and stdlib json.
+    """
+    return orjson.loads(resp.content) if orjson else resp.json()
+
 
 def clamp(s: Any, n: int) -> str:
     """
@@ -54,7 +79,7 @@ def clamp(s: Any, n: int) -> str:
     if s is None:
         s = ""
     s = str(s)
-    s = re.sub(r"\s+", " ", s).strip()
+    s = _WS_RE.sub(" ", s).strip()
     return s[:n]
 
 
@@ -113,6 +138,62 @@ def get_wp_auth() -> tuple:
     return (WP_USER, WP_APP_PASSWORD)
 
 
+# Shared WordPress session - a sync's requests to the same host reuse one
+# keep-alive connection (creates are not retried)
+WP = requests.Session()
+WP.auth = get_wp_auth()
+WP.headers.update({"User-Agent": "CNDBot/1.0", "Accept": "application/json"})
+_ADAPTER = HTTPAdapter(
+    pool_connections=20,
+    pool_maxsize=20,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False
+    )
+)
+WP.mount("https://", _ADAPTER)
+WP.mount("http://", _ADAPTER)
+
+
+def _fetch_all_terms(kind: str) -> Dict[int, Dict]:
+    """
+    Fetch every page of a WordPress term collection.
+    
+    Page 1 reports X-WP-TotalPages; pages 2..N are then requested
+    concurrently, so a site with more than 100 terms is seen in full.
+    
+    Args:
+        kind (str): REST collection name ("categories" or "tags")
+    
+    Returns:
+        dict: Term ID -> term data mapping ({} if page 1 fails)
+    
+    Raises:
+        requests.HTTPError: If one of the later pages fails
+    """
+    url = f"{WP_API_BASE}/wp/v2/{kind}"
+    resp = WP.get(url, params={"per_page": 100}, timeout=WP_TIMEOUT)
+    if resp.status_code != 200:
+        return {}
+    pages = [response_json(resp)]
+    total_pages = int(resp.headers.get("X-WP-TotalPages", "1") or 1)
+    if total_pages > 1:
+        def fetch_page(page):
+            r = WP.get(url, params={"per_page": 100, "page": page}, timeout=WP_TIMEOUT)
+            r.raise_for_status()
+            return response_json(r)
+        with ThreadPoolExecutor(max_workers=min(8, total_pages - 1)) as ex:
+            pages.extend(ex.map(fetch_page, range(2, total_pages + 1)))
+    return {term["id"]: term for page in pages for term in page}
+
+
+def term_name_key(name: str) -> str:
+    """Normalize a term name for comparison; the REST API returns names HTML-escaped."""
+    return html.unescape(name or "").strip().lower()
+
+
 def fetch_wp_categories() -> Dict[int, Dict]:
     """
     Fetch all existing WordPress categories.
@@ -120,16 +201,8 @@ def fetch_wp_categories() -> Dict[int, Dict]:
     Returns:
         dict: Category ID -> category data mapping
     """
-    auth = get_wp_auth()
-    
     try:
-        resp = requests.get(
-            f"{WP_API_BASE}/wp/v2/categories",
-            auth=auth,
-            params={"per_page": 100}
-        )
-        if resp.status_code == 200:
-            return {cat["id"]: cat for cat in resp.json()}
+        return _fetch_all_terms("categories")
     except Exception as e:
         print(f"Error fetching categories: {e}")
     
@@ -143,16 +216,8 @@ def fetch_wp_tags() -> Dict[int, Dict]:
     Returns:
         dict: Tag ID -> tag data mapping
     """
-    auth = get_wp_auth()
-    
     try:
-        resp = requests.get(
-            f"{WP_API_BASE}/wp/v2/tags",
-            auth=auth,
-            params={"per_page": 100}
-        )
-        if resp.status_code == 200:
-            return {tag["id"]: tag for tag in resp.json()}
+        return _fetch_all_terms("tags")
     except Exception as e:
         print(f"Error fetching tags: {e}")
     
@@ -170,16 +235,14 @@ def create_wp_category(name: str, description: str = "") -> Optional[int]:
     Returns:
         int: Created category ID, or None on failure
     """
-    auth = get_wp_auth()
-    
     try:
-        resp = requests.post(
+        resp = WP.post(
             f"{WP_API_BASE}/wp/v2/categories",
-            auth=auth,
-            json={"name": name, "description": description}
+            json={"name": name, "description": description},
+            timeout=WP_TIMEOUT
         )
         if resp.status_code in (200, 201):
-            return resp.json()["id"]
+            return response_json(resp)["id"]
     except Exception as e:
         print(f"Error creating category '{name}': {e}")
     
@@ -196,16 +259,14 @@ def create_wp_tag(name: str) -> Optional[int]:
     Returns:
         int: Created tag ID, or None on failure
     """
-    auth = get_wp_auth()
-    
     try:
-        resp = requests.post(
+        resp = WP.post(
             f"{WP_API_BASE}/wp/v2/tags",
-            auth=auth,
-            json={"name": name}
+            json={"name": name},
+            timeout=WP_TIMEOUT
         )
         if resp.status_code in (200, 201):
-            return resp.json()["id"]
+            return response_json(resp)["id"]
     except Exception as e:
         print(f"Error creating tag '{name}': {e}")
     
@@ -237,8 +298,9 @@ def sync_taxonomy(config_path: str = "config.json") -> Dict:
         print(f"Config file not found: {config_path}")
         return stats
     
-    with open(config_path) as f:
-        config = json.load(f)
+    with open(config_path, "rb") as f:
+        raw = f.read()
+    config = orjson.loads(raw) if orjson else json.loads(raw)
     
     # Get existing WordPress terms
     existing_cats = fetch_wp_categories()
@@ -247,6 +309,10 @@ def sync_taxonomy(config_path: str = "config.json") -> Dict:
     stats["existing_categories"] = len(existing_cats)
     stats["existing_tags"] = len(existing_tags)
     
+    # Name -> ID lookup, built once; created categories are added so a
+    # name repeated later in the config isn't created twice
+    existing_names = {term_name_key(c.get("name", "")): c["id"] for c in existing_cats.values()}
+    
     # Extract categories from config
     sites = config.get("sites", [])
     for site in sites:
@@ -254,11 +320,10 @@ def sync_taxonomy(config_path: str = "config.json") -> Dict:
         
         for category, brands in structure.items():
             # Create main category if not exists
-            existing_names = {c.get("name", "").lower(): c["id"] for c in existing_cats.values()}
-            
-            if category.lower() not in existing_names:
+            if term_name_key(category) not in existing_names:
                 cat_id = create_wp_category(category)
                 if cat_id:
+                    existing_names[term_name_key(category)] = cat_id
                     stats["categories_created"] += 1
                     print(f"Created category: {category}")
             
@@ -269,9 +334,10 @@ def sync_taxonomy(config_path: str = "config.json") -> Dict:
                     if isinstance(brand_data, dict):
                         brand_name = brand_data.get("brands", [brand])[0]
                     
-                    if brand_name.lower() not in existing_names:
+                    if term_name_key(brand_name) not in existing_names:
                         cat_id = create_wp_category(brand_name)
                         if cat_id:
+                            existing_names[term_name_key(brand_name)] = cat_id
                             stats["categories_created"] += 1
                             print(f"Created category: {brand_name}")
     